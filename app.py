@@ -1,15 +1,25 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import drilldown
+import kpis
+import prefetch
+import rollups
+import trends
+from figure_payload import plotly_chart
+from startup import lazy_import, mark
+from water_data import OVERVIEW_COLUMNS, load_dataset, selection
+
+px = lazy_import("plotly.express")
 
 # Titre principal
 st.set_page_config(page_title="Water Pollution & Health Impact", layout="wide")
 st.title("💧 Water Pollution & Health Impact")
 st.markdown("Analyse interactive des effets de la pollution de l’eau sur la santé à travers le monde 🌍")
+mark("shell")
 
 # Chargement des données
-df = pd.read_csv("water_pollution_disease.csv")
+df = load_dataset(OVERVIEW_COLUMNS)
 
 # Filtres
 with st.sidebar:
@@ -20,9 +30,7 @@ with st.sidebar:
     selected_country = st.selectbox("Sélectionne un pays", ["Tous"] + countries)
 
 # Filtrage des données
-filtered_df = df[df['Year'] == selected_year]
-if selected_country != "Tous":
-    filtered_df = filtered_df[filtered_df['Country'] == selected_country]
+filtered_df = selection(selected_year, selected_country)
 
 # KPI Cards
 st.markdown("### 📊 Indicateurs Clés")
@@ -32,30 +40,39 @@ col2.metric("Cas de Choléra / 100k", f"{filtered_df['Cholera Cases per 100,000
 col3.metric("Accès aux soins", f"{filtered_df['Healthcare Access Index (0-100)'].mean():.1f} / 100")
 col4.metric("Assainissement (%)", f"{filtered_df['Sanitation Coverage (% of Population)'].mean():.1f}%")
 
+# Médianes et p95 (esquisses de quantiles)
+kpis.render_quantiles(selected_year, selected_country)
+
 # Graphique 1 - Évolution nitrate
 st.markdown("### 📈 Évolution du nitrate dans l'eau")
 fig1 = px.line(df[df['Country'] == selected_country] if selected_country != "Tous" else df,
                x="Year", y="Nitrate Level (mg/L)", color="Country",
                title="Teneur en nitrate (mg/L) par an")
-st.plotly_chart(fig1, use_container_width=True)
+plotly_chart(fig1, use_container_width=True)
 
 # Graphique 2 - Top pays choléra
 st.markdown("### 🦠 Top 5 pays avec le plus de cas de choléra")
-top_cholera = df[df['Year'] == selected_year].groupby("Country")["Cholera Cases per 100,000 people"].mean().sort_values(ascending=False).head(5)
+top_cholera = rollups.countries(selected_year)["Cholera Cases per 100,000 people"].sort_values(ascending=False).head(5)
 fig2 = px.bar(top_cholera, x=top_cholera.values, y=top_cholera.index,
               orientation='h', labels={'x': 'Cas pour 100k'},
               title="Top 5 pays - Choléra")
-st.plotly_chart(fig2, use_container_width=True)
+plotly_chart(fig2, use_container_width=True)
 
 # Carte interactive (si assez de pays)
 if df['Country'].nunique() > 5:
     st.markdown("### 🌍 Carte interactive de la pollution")
-    map_data = df[df['Year'] == selected_year]
+    map_data = rollups.countries(selected_year).reset_index()
     fig_map = px.choropleth(map_data, locations="Country", locationmode="country names",
                             color="Contaminant Level (ppm)",
                             color_continuous_scale="Blues",
                             title="Pollution de l'eau par pays (ppm)")
-    st.plotly_chart(fig_map, use_container_width=True)
+    plotly_chart(fig_map, use_container_width=True)
+
+# Zoom par région
+drilldown.render(selected_year, selected_country, heading="###")
+
+# Alertes qualité de l'eau
+trends.render_alerts(selected_year, selected_country, heading="###")
 
 # Le saviez-vous ?
 st.markdown("### 💡 Le saviez-vous ?")
@@ -64,3 +81,6 @@ st.info(f"En {selected_year}, le pays avec le plus haut taux de plomb était **{
 
 st.markdown("---")
 st.caption("📊 Dashboard réalisé avec Python & Streamlit — Partagez vos insights sur LinkedIn !")
+
+# Préchargement des sélections voisines
+prefetch.record(selected_year, selected_country)
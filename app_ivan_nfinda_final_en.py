@@ -1,7 +1,16 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import drilldown
+import kpis
+import prefetch
+import rollups
+import trends
+from figure_payload import plotly_chart
+from startup import lazy_import, mark
+from water_data import OVERVIEW_COLUMNS, load_dataset, selection
+
+px = lazy_import("plotly.express")
 
 # Page config
 st.set_page_config(
@@ -47,9 +56,10 @@ h3 {
 # Header
 st.markdown("<h1>💧 Interactive Dashboard on Water Pollution & Health Impact</h1>", unsafe_allow_html=True)
 st.markdown("### A global exploration of water quality & human health impact 🌍")
+mark("shell")
 
 # Data
-df = pd.read_csv("water_pollution_disease.csv")
+df = load_dataset(OVERVIEW_COLUMNS)
 
 # Sidebar filters
 with st.sidebar:
@@ -57,8 +67,7 @@ with st.sidebar:
     year = st.selectbox("📅 Year", sorted(df['Year'].unique()), index=len(df['Year'].unique())-1)
     country = st.selectbox("🌐 Country", ["All"] + sorted(df['Country'].unique()))
 
-df_year = df[df["Year"] == year]
-df_selected = df_year if country == "All" else df_year[df_year["Country"] == country]
+df_selected = selection(year, country)
 
 # KPIs
 st.markdown("## 📊 Key Indicators")
@@ -68,16 +77,19 @@ col2.metric("🦠 Cholera / 100k", f"{df_selected['Cholera Cases per 100,000 peo
 col3.metric("🏥 Healthcare Access", f"{df_selected['Healthcare Access Index (0-100)'].mean():.1f}/100")
 col4.metric("🚿 Sanitation Coverage", f"{df_selected['Sanitation Coverage (% of Population)'].mean():.1f}%")
 
+# Medians and p95 (quantile sketches)
+kpis.render_quantiles(year, country, lang="en")
+
 # Nitrate chart - top 10 countries
 st.markdown("## 📈 Nitrate Level Evolution (Top 10 Countries)")
-top_nitrate_countries = df.groupby("Country")["Nitrate Level (mg/L)"].mean().nlargest(10).index
+top_nitrate_countries = df.groupby("Country", observed=True)["Nitrate Level (mg/L)"].mean().nlargest(10).index
 filtered_nitrate = df[df["Country"].isin(top_nitrate_countries)]
 fig_nitrate = px.line(
     filtered_nitrate,
     x="Year", y="Nitrate Level (mg/L)", color="Country",
     title="Nitrate Level Trends (mg/L)"
 )
-st.plotly_chart(fig_nitrate, use_container_width=True)
+plotly_chart(fig_nitrate, use_container_width=True)
 
 # Download filtered data
 st.download_button("📥 Download Filtered Data (CSV)", df_selected.to_csv(index=False), file_name="filtered_data.csv")
@@ -86,7 +98,7 @@ st.download_button("📥 Download Filtered Data (CSV)", df_selected.to_csv(index
 if df['Country'].nunique() > 5:
     st.markdown("## 🌍 Dynamic Pollution Map")
     map_fig = px.scatter_geo(
-        df_year,
+        rollups.countries(year).reset_index(),
         locations="Country",
         locationmode="country names",
         size="Contaminant Level (ppm)",
@@ -103,12 +115,18 @@ if df['Country'].nunique() > 5:
         size_max=40
     )
     map_fig.update_layout(geo=dict(showframe=False, showcoastlines=False))
-    st.plotly_chart(map_fig, use_container_width=True)
+    plotly_chart(map_fig, use_container_width=True)
+
+# Water quality by region
+drilldown.render(year, country, lang="en")
 
 # Table
 st.markdown("## 📋 Data Overview")
 st.dataframe(df_selected, use_container_width=True, height=400)
 
+# Water quality alerts
+trends.render_alerts(year, country, lang="en")
+
 # Fun Fact
 st.markdown("## 💡 Did you know?")
 worst = df_selected.sort_values(by="Lead Concentration (µg/L)", ascending=False).head(1)
@@ -119,3 +137,6 @@ if not worst.empty:
 # Footer
 st.markdown("---")
 st.caption("🧠 Built by Ivan NFINDA • Python | Streamlit | Data for Impact 💡")
+
+# Prefetch neighbouring selections
+prefetch.record(year, country)
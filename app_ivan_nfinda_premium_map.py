@@ -1,7 +1,16 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import drilldown
+import kpis
+import prefetch
+import rollups
+import trends
+from figure_payload import plotly_chart
+from startup import lazy_import, mark
+from water_data import OVERVIEW_COLUMNS, load_dataset, selection
+
+px = lazy_import("plotly.express")
 
 # Configuration
 st.set_page_config(
@@ -47,9 +56,10 @@ h3 {
 # En-tête
 st.markdown("<h1>💧 Dashboard interactif sur l'impact de la pollution de l'eau sur la santé</h1>", unsafe_allow_html=True)
 st.markdown("### Une exploration visuelle des données mondiales de santé et qualité de l'eau 🌍")
+mark("shell")
 
 # Données
-df = pd.read_csv("water_pollution_disease.csv")
+df = load_dataset(OVERVIEW_COLUMNS)
 
 # Filtres
 with st.sidebar:
@@ -57,8 +67,7 @@ with st.sidebar:
     year = st.selectbox("📅 Année", sorted(df['Year'].unique()), index=len(df['Year'].unique())-1)
     country = st.selectbox("🌐 Pays", ["Tous"] + sorted(df['Country'].unique()))
 
-df_year = df[df["Year"] == year]
-df_selected = df_year if country == "Tous" else df_year[df_year["Country"] == country]
+df_selected = selection(year, country)
 
 # KPIs
 st.markdown("## 📊 Indicateurs clés")
@@ -68,6 +77,9 @@ col2.metric("🦠 Choléra / 100k", f"{df_selected['Cholera Cases per 100,000 pe
 col3.metric("🏥 Accès aux soins", f"{df_selected['Healthcare Access Index (0-100)'].mean():.1f}/100")
 col4.metric("🚿 Taux d'assainissement", f"{df_selected['Sanitation Coverage (% of Population)'].mean():.1f}%")
 
+# Médianes et p95 (esquisses de quantiles)
+kpis.render_quantiles(year, country)
+
 # Graphique interactif
 st.markdown("## 📈 Évolution du nitrate dans l'eau")
 fig = px.line(
@@ -75,13 +87,13 @@ fig = px.line(
     x="Year", y="Nitrate Level (mg/L)", color="Country",
     title="Évolution de la teneur en nitrate (mg/L)"
 )
-st.plotly_chart(fig, use_container_width=True)
+plotly_chart(fig, use_container_width=True)
 
 # Carte interactive améliorée
 if df['Country'].nunique() > 5:
     st.markdown("## 🗺️ Carte dynamique des niveaux de pollution")
     map_fig = px.scatter_geo(
-        df_year,
+        rollups.countries(year).reset_index(),
         locations="Country",
         locationmode="country names",
         size="Contaminant Level (ppm)",
@@ -98,12 +110,18 @@ if df['Country'].nunique() > 5:
         size_max=40
     )
     map_fig.update_layout(geo=dict(showframe=False, showcoastlines=False))
-    st.plotly_chart(map_fig, use_container_width=True)
+    plotly_chart(map_fig, use_container_width=True)
+
+# Zoom par région
+drilldown.render(year, country)
 
 # Données tabulaires
 st.markdown("## 📋 Aperçu des données")
 st.dataframe(df_selected, use_container_width=True, height=400)
 
+# Alertes qualité de l'eau
+trends.render_alerts(year, country)
+
 # Fun Fact
 st.markdown("## 💡 Le saviez-vous ?")
 worst = df_selected.sort_values(by="Lead Concentration (µg/L)", ascending=False).head(1)
@@ -114,3 +132,6 @@ if not worst.empty:
 # Footer
 st.markdown("---")
 st.caption("🧠 Réalisé par Ivan NFINDA • Python | Streamlit | Data for Impact 💡")
+
+# Préchargement des sélections voisines
+prefetch.record(year, country)
@@ -1,7 +1,16 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import drilldown
+import kpis
+import prefetch
+import rollups
+import trends
+from figure_payload import plotly_chart
+from startup import lazy_import, mark
+from water_data import OVERVIEW_COLUMNS, load_dataset, selection
+
+px = lazy_import("plotly.express")
 
 # Configuration de la page
 st.set_page_config(
@@ -35,9 +44,10 @@ st.markdown("""
 st.markdown("<div class='block-container'>", unsafe_allow_html=True)
 st.title("💧 Water Pollution & Health Impact Dashboard")
 st.markdown("### Analyse interactive de l'impact de la pollution de l’eau sur la santé humaine 🌿")
+mark("shell")
 
 # Chargement des données
-df = pd.read_csv("water_pollution_disease.csv")
+df = load_dataset(OVERVIEW_COLUMNS)
 
 # Filtres dans la barre latérale
 with st.sidebar:
@@ -48,9 +58,7 @@ with st.sidebar:
     selected_country = st.selectbox("🌍 Pays", ["Tous"] + countries)
 
 # Filtrage des données
-filtered_df = df[df['Year'] == selected_year]
-if selected_country != "Tous":
-    filtered_df = filtered_df[filtered_df['Country'] == selected_country]
+filtered_df = selection(selected_year, selected_country)
 
 # Indicateurs clés
 st.markdown("## 📊 Indicateurs clés")
@@ -60,31 +68,40 @@ k2.metric("🦠 Choléra / 100k", f"{filtered_df['Cholera Cases per 100,000 peop
 k3.metric("🏥 Accès soins", f"{filtered_df['Healthcare Access Index (0-100)'].mean():.1f} / 100")
 k4.metric("🚿 Assainissement", f"{filtered_df['Sanitation Coverage (% of Population)'].mean():.1f}%")
 
+# Médianes et p95 (esquisses de quantiles)
+kpis.render_quantiles(selected_year, selected_country)
+
 # Graphique 1 - évolution du nitrate
 st.markdown("## 📈 Évolution du nitrate dans l'eau")
 fig1 = px.line(df[df['Country'] == selected_country] if selected_country != "Tous" else df,
                x="Year", y="Nitrate Level (mg/L)", color="Country",
                title="Évolution de la teneur en nitrate (mg/L)")
 fig1.update_layout(paper_bgcolor='rgba(0,0,0,0)', font_color="white")
-st.plotly_chart(fig1, use_container_width=True)
+plotly_chart(fig1, use_container_width=True)
 
 # Graphique 2 - top choléra
 st.markdown("## 🧬 Top 5 pays touchés par le choléra")
-top_cholera = df[df['Year'] == selected_year].groupby("Country")["Cholera Cases per 100,000 people"].mean().sort_values(ascending=False).head(5)
+top_cholera = rollups.countries(selected_year)["Cholera Cases per 100,000 people"].sort_values(ascending=False).head(5)
 fig2 = px.bar(top_cholera, x=top_cholera.values, y=top_cholera.index,
               orientation='h', labels={'x': 'Cas pour 100k'}, title="Pays les plus touchés")
 fig2.update_layout(paper_bgcolor='rgba(0,0,0,0)', font_color="white")
-st.plotly_chart(fig2, use_container_width=True)
+plotly_chart(fig2, use_container_width=True)
 
 # Carte interactive
 if df['Country'].nunique() > 5:
     st.markdown("## 🌍 Carte mondiale de la pollution")
-    map_data = df[df['Year'] == selected_year]
+    map_data = rollups.countries(selected_year).reset_index()
     fig_map = px.choropleth(map_data, locations="Country", locationmode="country names",
                             color="Contaminant Level (ppm)", color_continuous_scale="blues",
                             title="Pollution de l'eau par pays (ppm)")
     fig_map.update_layout(paper_bgcolor='rgba(0,0,0,0)', font_color="white")
-    st.plotly_chart(fig_map, use_container_width=True)
+    plotly_chart(fig_map, use_container_width=True)
+
+# Zoom par région
+drilldown.render(selected_year, selected_country)
+
+# Alertes qualité de l'eau
+trends.render_alerts(selected_year, selected_country)
 
 # Section le saviez-vous ?
 st.markdown("## 💡 Le saviez-vous ?")
@@ -99,3 +116,6 @@ with col2:
 st.markdown("---")
 st.caption("🚀 Tableau de bord réalisé avec Streamlit | Design premium 💎 par Ivan NFINDA – Ensemble, agissons pour un futur plus propre 💧")
 st.markdown("</div>", unsafe_allow_html=True)
+
+# Préchargement des sélections voisines
+prefetch.record(selected_year, selected_country)
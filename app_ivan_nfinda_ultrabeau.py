@@ -1,7 +1,16 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import drilldown
+import kpis
+import prefetch
+import rollups
+import trends
+from figure_payload import plotly_chart
+from startup import lazy_import, mark
+from water_data import OVERVIEW_COLUMNS, load_dataset, selection
+
+px = lazy_import("plotly.express")
 
 st.set_page_config(
     page_title="💧 Water Health Dashboard - Ivan NFINDA",
@@ -66,8 +75,9 @@ st.markdown(
 st.markdown("<div class='block'>", unsafe_allow_html=True)
 st.title("💧 Tableau de bord sur la pollution de l'eau & la santé")
 st.markdown("### Visualisation interactive mondiale – Protégeons notre eau, ensemble 🌍")
+mark("shell")
 
-df = pd.read_csv("water_pollution_disease.csv")
+df = load_dataset(OVERVIEW_COLUMNS)
 
 with st.sidebar:
     st.header("🎯 Filtres")
@@ -76,9 +86,7 @@ with st.sidebar:
     countries = sorted(df['Country'].unique())
     selected_country = st.selectbox("🌐 Pays", ["Tous"] + countries)
 
-filtered_df = df[df['Year'] == selected_year]
-if selected_country != "Tous":
-    filtered_df = filtered_df[filtered_df['Country'] == selected_country]
+filtered_df = selection(selected_year, selected_country)
 
 st.markdown("## 📊 Indicateurs clés")
 k1, k2, k3, k4 = st.columns(4)
@@ -87,25 +95,28 @@ k2.metric("🦠 Choléra / 100k", f"{filtered_df['Cholera Cases per 100,000 peop
 k3.metric("🏥 Accès soins", f"{filtered_df['Healthcare Access Index (0-100)'].mean():.1f} / 100")
 k4.metric("🚿 Assainissement", f"{filtered_df['Sanitation Coverage (% of Population)'].mean():.1f}%")
 
+# Médianes et p95 (esquisses de quantiles)
+kpis.render_quantiles(selected_year, selected_country)
+
 st.markdown("## 📈 Teneur en nitrate par pays")
 fig1 = px.line(
     df[df['Country'] == selected_country] if selected_country != "Tous" else df,
     x="Year", y="Nitrate Level (mg/L)", color="Country",
     title="Évolution de la teneur en nitrate (mg/L)"
 )
-st.plotly_chart(fig1, use_container_width=True)
+plotly_chart(fig1, use_container_width=True)
 
 st.markdown("## 🧬 Top 5 pays touchés par le choléra")
-top_cholera = df[df['Year'] == selected_year].groupby("Country")["Cholera Cases per 100,000 people"].mean().sort_values(ascending=False).head(5)
+top_cholera = rollups.countries(selected_year)["Cholera Cases per 100,000 people"].sort_values(ascending=False).head(5)
 fig2 = px.bar(
     top_cholera, x=top_cholera.values, y=top_cholera.index,
     orientation='h', labels={'x': 'Cas pour 100k'}, title="Pays les plus touchés"
 )
-st.plotly_chart(fig2, use_container_width=True)
+plotly_chart(fig2, use_container_width=True)
 
 if df['Country'].nunique() > 5:
     st.markdown("## 🌍 Carte interactive de la pollution")
-    map_data = df[df['Year'] == selected_year]
+    map_data = rollups.countries(selected_year).reset_index()
     fig_map = px.choropleth(
         map_data,
         locations="Country",
@@ -121,11 +132,17 @@ if df['Country'].nunique() > 5:
         title="Niveaux de pollution de l'eau (ppm)"
     )
     fig_map.update_layout(margin={"r":0,"t":40,"l":0,"b":0})
-    st.plotly_chart(fig_map, use_container_width=True)
+    plotly_chart(fig_map, use_container_width=True)
+
+# Zoom par région
+drilldown.render(selected_year, selected_country)
 
 st.markdown("## 📋 Données interactives")
 st.dataframe(filtered_df, use_container_width=True, height=400)
 
+# Alertes qualité de l'eau
+trends.render_alerts(selected_year, selected_country)
+
 st.markdown("## 💡 Le saviez-vous ?")
 fact = filtered_df.sort_values(by="Lead Concentration (µg/L)", ascending=False).iloc[0]
 st.info(f"En {selected_year}, {fact['Country']} avait la concentration en plomb la plus élevée : {fact['Lead Concentration (µg/L)']:.2f} µg/L.")
@@ -133,3 +150,6 @@ st.info(f"En {selected_year}, {fact['Country']} avait la concentration en plomb
 st.markdown("---")
 st.caption("🚀 Conçu avec 💙 par Ivan NFINDA | Python & Streamlit | Agissons ensemble pour une eau plus propre 🌊")
 st.markdown("</div>", unsafe_allow_html=True)
+
+# Préchargement des sélections voisines
+prefetch.record(selected_year, selected_country)
@@ -1,7 +1,16 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import drilldown
+import kpis
+import prefetch
+import rollups
+import trends
+from figure_payload import plotly_chart
+from startup import lazy_import, mark
+from water_data import OVERVIEW_COLUMNS, load_dataset, selection
+
+px = lazy_import("plotly.express")
 
 # Configuration de la page
 st.set_page_config(
@@ -52,9 +61,10 @@ st.video("https://www.youtube.com/watch?v=d5F-JzOpXEQ")  # vidéo sur l'eau et l
 st.markdown("<div class='block'>", unsafe_allow_html=True)
 st.title("💧 Tableau de bord sur la pollution de l'eau et son impact sur la santé")
 st.markdown("### Analyse interactive des effets sanitaires liés à la qualité de l'eau dans le monde 🌍")
+mark("shell")
 
 # Données
-df = pd.read_csv("water_pollution_disease.csv")
+df = load_dataset(OVERVIEW_COLUMNS)
 
 # Filtres
 with st.sidebar:
@@ -64,9 +74,7 @@ with st.sidebar:
     countries = sorted(df['Country'].unique())
     selected_country = st.selectbox("🌐 Pays", ["Tous"] + countries)
 
-filtered_df = df[df['Year'] == selected_year]
-if selected_country != "Tous":
-    filtered_df = filtered_df[filtered_df['Country'] == selected_country]
+filtered_df = selection(selected_year, selected_country)
 
 # Indicateurs
 st.markdown("## 📊 Indicateurs clés")
@@ -76,6 +84,9 @@ k2.metric("🦠 Choléra / 100k", f"{filtered_df['Cholera Cases per 100,000 peop
 k3.metric("🏥 Accès soins", f"{filtered_df['Healthcare Access Index (0-100)'].mean():.1f} / 100")
 k4.metric("🚿 Assainissement", f"{filtered_df['Sanitation Coverage (% of Population)'].mean():.1f}%")
 
+# Médianes et p95 (esquisses de quantiles)
+kpis.render_quantiles(selected_year, selected_country)
+
 # Graphique 1
 st.markdown("## 📈 Évolution du nitrate dans l'eau")
 fig1 = px.line(
@@ -83,32 +94,38 @@ fig1 = px.line(
     x="Year", y="Nitrate Level (mg/L)", color="Country",
     title="Évolution de la teneur en nitrate (mg/L)"
 )
-st.plotly_chart(fig1, use_container_width=True)
+plotly_chart(fig1, use_container_width=True)
 
 # Graphique 2
 st.markdown("## 🧬 Top 5 pays touchés par le choléra")
-top_cholera = df[df['Year'] == selected_year].groupby("Country")["Cholera Cases per 100,000 people"].mean().sort_values(ascending=False).head(5)
+top_cholera = rollups.countries(selected_year)["Cholera Cases per 100,000 people"].sort_values(ascending=False).head(5)
 fig2 = px.bar(
     top_cholera, x=top_cholera.values, y=top_cholera.index,
     orientation='h', labels={'x': 'Cas pour 100k'}, title="Pays les plus touchés"
 )
-st.plotly_chart(fig2, use_container_width=True)
+plotly_chart(fig2, use_container_width=True)
 
 # Carte
 if df['Country'].nunique() > 5:
     st.markdown("## 🌍 Carte de la pollution par pays")
-    map_data = df[df['Year'] == selected_year]
+    map_data = rollups.countries(selected_year).reset_index()
     fig_map = px.choropleth(
         map_data, locations="Country", locationmode="country names",
         color="Contaminant Level (ppm)", color_continuous_scale="Teal",
         title="Pollution de l'eau (ppm)"
     )
-    st.plotly_chart(fig_map, use_container_width=True)
+    plotly_chart(fig_map, use_container_width=True)
+
+# Zoom par région
+drilldown.render(selected_year, selected_country)
 
 # Tableau interactif
 st.markdown("## 📋 Données détaillées")
 st.dataframe(filtered_df, use_container_width=True, height=400)
 
+# Alertes qualité de l'eau
+trends.render_alerts(selected_year, selected_country)
+
 # Le saviez-vous ?
 st.markdown("## 💡 Le saviez-vous ?")
 fact = filtered_df.sort_values(by="Lead Concentration (µg/L)", ascending=False).iloc[0]
@@ -118,3 +135,6 @@ st.info(f"En {selected_year}, {fact['Country']} avait la concentration en plomb
 st.markdown("---")
 st.caption("🚀 Créé avec 💙 par Ivan NFINDA | Streamlit + Python + Data Viz | Let’s protect our water, together 🌊")
 st.markdown("</div>", unsafe_allow_html=True)
+
+# Préchargement des sélections voisines
+prefetch.record(selected_year, selected_country)
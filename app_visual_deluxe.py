@@ -1,7 +1,16 @@
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import drilldown
+import kpis
+import prefetch
+import rollups
+import trends
+from figure_payload import plotly_chart
+from startup import lazy_import, mark
+from water_data import OVERVIEW_COLUMNS, load_dataset, selection
+
+px = lazy_import("plotly.express")
 
 # Configuration de la page
 st.set_page_config(page_title="💧 Water Dashboard", layout="wide")
@@ -12,9 +21,10 @@ st.image("https://images.unsplash.com/photo-1505740420928-5e560c06d30e", use_col
 # Titre
 st.title("💧 Water Pollution & Health Impact Dashboard")
 st.markdown("### Une visualisation interactive de l'impact de la pollution de l'eau sur la santé humaine 🌿")
+mark("shell")
 
 # Chargement des données
-df = pd.read_csv("water_pollution_disease.csv")
+df = load_dataset(OVERVIEW_COLUMNS)
 
 # Sidebar - filtres
 with st.sidebar:
@@ -25,9 +35,7 @@ with st.sidebar:
     selected_country = st.selectbox("🌐 Pays", ["Tous"] + countries)
 
 # Filtrage
-filtered_df = df[df['Year'] == selected_year]
-if selected_country != "Tous":
-    filtered_df = filtered_df[filtered_df['Country'] == selected_country]
+filtered_df = selection(selected_year, selected_country)
 
 # Cartes de KPI
 st.markdown("## 📊 Indicateurs Clés")
@@ -37,28 +45,37 @@ k2.metric("🦠 Choléra / 100k", f"{filtered_df['Cholera Cases per 100,000 peop
 k3.metric("🏥 Accès soins", f"{filtered_df['Healthcare Access Index (0-100)'].mean():.1f} / 100")
 k4.metric("🚿 Assainissement", f"{filtered_df['Sanitation Coverage (% of Population)'].mean():.1f}%")
 
+# Médianes et p95 (esquisses de quantiles)
+kpis.render_quantiles(selected_year, selected_country)
+
 # Graphique 1 : Évolution nitrate
 st.markdown("## 📈 Évolution du nitrate dans l'eau")
 fig1 = px.line(df[df['Country'] == selected_country] if selected_country != "Tous" else df,
                x="Year", y="Nitrate Level (mg/L)", color="Country",
                title="Teneur en nitrate (mg/L) par an")
-st.plotly_chart(fig1, use_container_width=True)
+plotly_chart(fig1, use_container_width=True)
 
 # Graphique 2 : Top choléra
 st.markdown("## 🧬 Top 5 pays - Choléra")
-top_cholera = df[df['Year'] == selected_year].groupby("Country")["Cholera Cases per 100,000 people"].mean().sort_values(ascending=False).head(5)
+top_cholera = rollups.countries(selected_year)["Cholera Cases per 100,000 people"].sort_values(ascending=False).head(5)
 fig2 = px.bar(top_cholera, x=top_cholera.values, y=top_cholera.index,
               orientation='h', labels={'x': 'Cas pour 100k'}, title="Pays les plus touchés")
-st.plotly_chart(fig2, use_container_width=True)
+plotly_chart(fig2, use_container_width=True)
 
 # Carte
 if df['Country'].nunique() > 5:
     st.markdown("## 🌍 Carte interactive - Pollution")
-    map_data = df[df['Year'] == selected_year]
+    map_data = rollups.countries(selected_year).reset_index()
     fig_map = px.choropleth(map_data, locations="Country", locationmode="country names",
                             color="Contaminant Level (ppm)", color_continuous_scale="blues",
                             title="Pollution de l'eau par pays (ppm)")
-    st.plotly_chart(fig_map, use_container_width=True)
+    plotly_chart(fig_map, use_container_width=True)
+
+# Zoom par région
+drilldown.render(selected_year, selected_country)
+
+# Alertes qualité de l'eau
+trends.render_alerts(selected_year, selected_country)
 
 # Le saviez-vous
 st.markdown("## 💡 Le saviez-vous ?")
@@ -72,3 +89,6 @@ with col2:
 # Footer
 st.markdown("---")
 st.caption("🚀 Dashboard réalisé avec Streamlit | Design amélioré 💎 par [TonNom] – Partagez vos idées, agissez pour l'eau !")
+
+# Préchargement des sélections voisines
+prefetch.record(selected_year, selected_country)
@@ -0,0 +1,52 @@
+"""Lance un tableau de bord Streamlit, en option avec les caches déjà chauds.
+
+    python boot.py [--warm] app_ivan_nfinda_ultrabeau.py [options streamlit...]
+
+Avec ``--warm``, le jeu de données est chargé et la vue par défaut (dernière
+année, tous les pays) précalculée avant que le serveur n'accepte du trafic :
+Streamlit exécute les scripts dans ce même processus et réutilise ces caches.
+"""
+
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("WATER_DASHBOARD_BOOT_T0", str(time.time()))
+
+import startup  # noqa: E402
+
+
+def warm():
+    import plotly.express  # noqa: F401
+
+    import rollups
+    import sketches
+    import trends
+    import water_data
+
+    water_data.load_dataset(water_data.OVERVIEW_COLUMNS)
+    latest = max(water_data.years())
+    water_data.selection(latest, "Tous")
+    rollups.countries(latest)
+    trends.trend_table()
+    sketches.quantiles(latest, "Tous", "Bacteria Count (CFU/mL)")
+    startup.mark("warm")
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if "--warm" in argv:
+        argv.remove("--warm")
+        warm()
+    if not argv:
+        sys.exit("usage: python boot.py [--warm] APP.py [options streamlit...]")
+
+    from streamlit.web import cli
+
+    cli.main(["run", *argv], prog_name="streamlit")
+
+
+if __name__ == "__main__":
+    main()
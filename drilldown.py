@@ -0,0 +1,62 @@
+"""Section « zoom par région » : Monde → Pays → Région, lue dans ``rollups``."""
+
+import streamlit as st
+
+import rollups
+from figure_payload import plotly_chart
+from startup import lazy_import
+from water_data import ALL_COUNTRIES
+
+px = lazy_import("plotly.express")
+
+TEXTS = {
+    "fr": {
+        "title": "🔎 Zoom par région",
+        "world": "Moyenne mondiale {year}",
+        "pick": "Sélectionne un pays pour descendre au niveau des régions.",
+        "country": "{country} en {year}",
+        "regions": "{column} par région – {country} ({year})",
+    },
+    "en": {
+        "title": "🔎 Regional Drilldown",
+        "world": "World average {year}",
+        "pick": "Select a country to drill down to its regions.",
+        "country": "{country} in {year}",
+        "regions": "{column} by region – {country} ({year})",
+    },
+}
+
+
+def render(year, country, column="Contaminant Level (ppm)", lang="fr", heading="##"):
+    """Affiche le niveau monde, ou le pays sélectionné et ses régions."""
+    text = TEXTS[lang]
+    st.markdown(f"{heading} {text['title']}")
+
+    if country in ALL_COUNTRIES:
+        st.metric(text["world"].format(year=year), f"{rollups.world(year)[column]:.2f}")
+        st.caption(text["pick"])
+        return
+
+    by_country = rollups.countries(year)
+    if country not in by_country.index:
+        return
+    col1, col2 = st.columns([2, 3])
+    with col1:
+        st.metric(text["country"].format(country=country, year=year),
+                  f"{by_country.loc[country, column]:.2f}")
+        fig_country = px.choropleth(
+            by_country.loc[[country]].reset_index(),
+            locations="Country", locationmode="country names",
+            color=column, color_continuous_scale="Blues",
+        )
+        fig_country.update_geos(fitbounds="locations", visible=False)
+        fig_country.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0})
+        plotly_chart(fig_country, name=f"drilldown-{country}", use_container_width=True)
+    with col2:
+        by_region = rollups.regions(year, country).reset_index()
+        fig_regions = px.bar(
+            by_region, x="Region", y=column, color=column,
+            color_continuous_scale="Blues", hover_data=["Records"],
+            title=text["regions"].format(column=column, country=country, year=year),
+        )
+        plotly_chart(fig_regions, use_container_width=True)
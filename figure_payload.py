@@ -0,0 +1,169 @@
+"""Encodage compact des figures Plotly envoyées au navigateur.
+
+Les tableaux numériques des traces sont émis en tableaux typés (base64 binaire,
+format ``{"dtype", "bdata", "shape"}`` compris par Plotly.js), réduits en
+float32 / petits entiers quand la précision le permet, et les colonnes de
+``customdata`` qu'aucun ``hovertemplate`` n'affiche sont retirées.
+"""
+
+import base64
+import logging
+import re
+
+from startup import lazy_import, mark
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+# Types acceptés par Plotly.js pour les tableaux typés (pas d'entiers 64 bits).
+INT_DTYPES = ("i1", "u1", "i2", "u2", "i4", "u4")
+
+# Nombre de décimales à conserver lors du passage en float32 (le CSV en a 2).
+FLOAT32_DECIMALS = 3
+
+# En dessous de cette taille, l'en-tête du tableau typé coûte plus qu'il ne rapporte.
+MIN_TYPED_LENGTH = 8
+
+CUSTOMDATA_REF = re.compile(r"customdata\[(\d+)\]")
+
+# Taille JSON (octets) de chaque figure, avant et après compactage, mesurée
+# ensemble au premier affichage de chaque (nom, forme des données).
+PAYLOAD_STATS = {}
+_measured = set()
+
+
+def _smallest_int_dtype(values):
+    lo, hi = values.min(), values.max()
+    for code in INT_DTYPES:
+        info = np.iinfo(np.dtype(code))
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(code)
+    return np.dtype("f8")
+
+
+def downcast(values, decimals=FLOAT32_DECIMALS):
+    """Renvoie le plus petit type numérique qui représente ``values`` sans perte visible."""
+    if values.dtype.kind == "b":
+        return values.astype("u1")
+    if values.dtype.kind in "iu":
+        if values.size == 0:
+            return values.astype("i4")
+        return values.astype(_smallest_int_dtype(values))
+    values = values.astype("f8", copy=False)
+    finite = values[np.isfinite(values)]
+    if finite.size and np.abs(finite).max() > np.finfo("f4").max:
+        return values
+    as_f4 = values.astype("f4")
+    same = np.array_equal(
+        np.round(as_f4.astype("f8"), decimals), np.round(values, decimals), equal_nan=True
+    )
+    return as_f4 if same else values
+
+
+def typed_array(values, decimals=FLOAT32_DECIMALS):
+    """Encode un tableau numérique en spécification de tableau typé Plotly."""
+    values = np.ascontiguousarray(downcast(np.asarray(values), decimals))
+    spec = {
+        "dtype": values.dtype.str.lstrip("<>|="),
+        "bdata": base64.b64encode(values.tobytes()).decode("ascii"),
+    }
+    if values.ndim > 1:
+        spec["shape"] = ", ".join(str(n) for n in values.shape)
+    return spec
+
+
+def _as_numeric(value):
+    if isinstance(value, np.ndarray):
+        array = value
+    elif isinstance(value, (list, tuple)) and len(value) >= MIN_TYPED_LENGTH:
+        array = np.asarray(value)
+    else:
+        return None
+    if array.dtype.kind not in "biuf" or array.size < MIN_TYPED_LENGTH:
+        return None
+    return array
+
+
+def _encode_arrays(node, decimals):
+    if isinstance(node, dict):
+        return {key: _encode_arrays(value, decimals) for key, value in node.items()}
+    array = _as_numeric(node)
+    if array is not None:
+        return typed_array(array, decimals)
+    return node
+
+
+def _prune_hover(trace):
+    """Retire les colonnes de survol que le ``hovertemplate`` n'affiche pas."""
+    if trace.get("hoverinfo") in ("skip", "none") and "hovertemplate" not in trace:
+        trace.pop("hovertext", None)
+        trace.pop("customdata", None)
+        return trace
+
+    customdata = trace.get("customdata")
+    template = trace.get("hovertemplate")
+    if customdata is None or not isinstance(template, str):
+        return trace
+
+    used = sorted({int(i) for i in CUSTOMDATA_REF.findall(template)})
+    if not used:
+        trace.pop("customdata")
+        return trace
+
+    columns = np.asarray(customdata)
+    if columns.ndim != 2 or used == list(range(columns.shape[1])):
+        return trace
+    new_index = {old: new for new, old in enumerate(used)}
+    trace["customdata"] = columns[:, used]
+    trace["hovertemplate"] = CUSTOMDATA_REF.sub(
+        lambda m: f"customdata[{new_index[int(m.group(1))]}]", template
+    )
+    return trace
+
+
+def compact_figure(fig, decimals=FLOAT32_DECIMALS):
+    """Renvoie une copie de ``fig`` avec des traces compactes (tableaux typés, survol élagué)."""
+    import plotly.graph_objects as go
+
+    traces = []
+    for trace in fig.data:
+        data = _prune_hover(trace.to_plotly_json())
+        traces.append(_encode_arrays(data, decimals))
+    return go.Figure(data=traces, layout=fig.layout)
+
+
+def payload_nbytes(fig):
+    """Taille en octets du JSON que Streamlit envoie au navigateur pour ``fig``."""
+    import plotly.io as pio
+
+    return len(pio.to_json(fig, validate=False).encode("utf-8"))
+
+
+def _data_shape(fig):
+    """Longueur des tableaux de chaque trace : la taille du JSON ne dépend que d'elle."""
+    return tuple(
+        tuple(sorted(
+            (key, len(value)) for key, value in trace.to_plotly_json().items()
+            if isinstance(value, (list, tuple, np.ndarray))
+        ))
+        for trace in fig.data
+    )
+
+
+def plotly_chart(fig, name=None, **kwargs):
+    """Affiche ``fig`` via ``st.plotly_chart`` après compactage, en journalisant sa taille."""
+    import streamlit as st
+
+    compact = compact_figure(fig)
+    name = name or fig.layout.title.text or "+".join(trace.type for trace in fig.data)
+    key = (name, _data_shape(fig))
+    if key not in _measured:
+        # Mesure échantillonnée : deux sérialisations en plus, une seule fois par forme.
+        _measured.add(key)
+        before, after = payload_nbytes(fig), payload_nbytes(compact)
+        PAYLOAD_STATS[name] = {"plain_bytes": before, "compact_bytes": after}
+        logger.info("figure %r : %d -> %d octets", name, before, after)
+    chart = st.plotly_chart(compact, **kwargs)
+    mark("first_chart")
+    return chart
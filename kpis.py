@@ -0,0 +1,38 @@
+"""Rangée d'indicateurs médiane / p95, lue dans les esquisses de ``sketches``."""
+
+import streamlit as st
+
+from sketches import quantiles
+
+TEXTS = {
+    "fr": {
+        "median": "médiane",
+        "p90": "p90 : {value}",
+        "Bacteria Count (CFU/mL)": "Bactéries",
+        "Lead Concentration (µg/L)": "Plomb",
+    },
+    "en": {
+        "median": "median",
+        "p90": "p90: {value}",
+        "Bacteria Count (CFU/mL)": "Bacteria",
+        "Lead Concentration (µg/L)": "Lead",
+    },
+}
+
+# (colonne, icône, unité, format d'affichage)
+QUANTILE_COLUMNS = (
+    ("Bacteria Count (CFU/mL)", "🧫", "CFU/mL", "{:.0f}"),
+    ("Lead Concentration (µg/L)", "🧪", "µg/L", "{:.2f}"),
+)
+
+
+def render_quantiles(year, country, lang="fr"):
+    """Affiche la médiane et le p95 (p90 en info-bulle) de chaque colonne de ``QUANTILE_COLUMNS``."""
+    text = TEXTS[lang]
+    cells = st.columns(2 * len(QUANTILE_COLUMNS))
+    for i, (column, icon, unit, fmt) in enumerate(QUANTILE_COLUMNS):
+        q = quantiles(year, country, column)
+        label = f"{icon} {text[column]}"
+        cells[2 * i].metric(f"{label} {text['median']} ({unit})", fmt.format(q[0.5]))
+        cells[2 * i + 1].metric(f"{label} p95 ({unit})", fmt.format(q[0.95]),
+                                help=text["p90"].format(value=fmt.format(q[0.9])))
@@ -0,0 +1,192 @@
+"""Jeu de données partitionné par année (et optionnellement par pays) sur disque.
+
+    data/
+      _schema.json              ordre des colonnes, partitionnement par pays ou non
+      _VERSION                  change à chaque ajout de partitions
+      Year=2015/_VERSION        change quand des partitions de l'année sont ajoutées
+      Year=2015/part-<id>.parquet
+      Year=2016/Country=India/part-<id>.parquet      (avec --by-country)
+
+Un nouvel extrait annuel ajoute des fichiers ``part-*`` sans réécrire les
+anciens. La lecture n'ouvre que les répertoires des années (et pays)
+demandés, et seulement les colonnes demandées.
+
+    python partitions.py [water_pollution_disease.csv] [--root data] [--by-country]
+"""
+
+import argparse
+import json
+import os
+import time
+from urllib.parse import quote, unquote
+
+SCHEMA = "_schema.json"
+VERSION = "_VERSION"
+
+
+def _replace_file(path, text):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _read_token(path):
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def layout_version(root):
+    """Jeton de version du répertoire partitionné, ou ``None`` s'il n'existe pas."""
+    return _read_token(os.path.join(root, VERSION))
+
+
+def read_schema(root):
+    with open(os.path.join(root, SCHEMA)) as f:
+        return json.load(f)
+
+
+def _year_dir(root, year):
+    return os.path.join(root, f"Year={int(year)}")
+
+
+def _country_dir(root, year, country):
+    return os.path.join(_year_dir(root, year), f"Country={quote(str(country), safe='')}")
+
+
+def write(df, root, by_country=False):
+    """Ajoute ``df`` comme nouvelles partitions ; les fichiers existants ne sont pas touchés."""
+    os.makedirs(root, exist_ok=True)
+    schema = {"columns": list(df.columns), "by_country": by_country}
+    if os.path.exists(os.path.join(root, SCHEMA)):
+        existing = read_schema(root)
+        if existing != schema:
+            raise ValueError(f"schéma incompatible avec {root} : {existing}")
+    else:
+        _replace_file(os.path.join(root, SCHEMA), json.dumps(schema))
+
+    keys = ["Year", "Country"] if by_country else ["Year"]
+    token = f"{time.time_ns()}-{os.getpid()}"
+    years = set()
+    for key, part in df.groupby(keys, observed=True):
+        year = key[0]
+        directory = _country_dir(root, year, key[1]) if by_country else _year_dir(root, year)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{token}.parquet")
+        part.drop(columns=keys).to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        years.add(year)
+
+    for year in years:
+        _replace_file(os.path.join(_year_dir(root, year), VERSION), token)
+    _replace_file(os.path.join(root, VERSION), token)
+
+
+def _list_dirs(directory, prefix):
+    try:
+        return sorted(d for d in os.listdir(directory) if d.startswith(prefix))
+    except FileNotFoundError:
+        return []
+
+
+def partition_years(root):
+    """Années présentes, lues dans les noms de répertoires."""
+    return [int(d.split("=", 1)[1]) for d in _list_dirs(root, "Year=")]
+
+
+def year_token(root, year):
+    """Jeton de ``year`` (``Year=…/_VERSION``) : il ne change que si des partitions y
+    sont ajoutées. Un répertoire écrit sans ce fichier suit la version globale."""
+    return _read_token(os.path.join(_year_dir(root, year), VERSION)) or layout_version(root)
+
+
+def _files(root, schema, years, countries):
+    """(fichier, année, pays) des partitions à lire, après élagage par répertoire."""
+    for year in partition_years(root) if years is None else years:
+        if not schema["by_country"]:
+            directory = _year_dir(root, year)
+            for name in _list_dirs(directory, "part-"):
+                if name.endswith(".parquet"):
+                    yield os.path.join(directory, name), int(year), None
+            continue
+        if countries is None:
+            wanted = [unquote(d.split("=", 1)[1])
+                      for d in _list_dirs(_year_dir(root, year), "Country=")]
+        else:
+            wanted = countries
+        for country in wanted:
+            directory = _country_dir(root, year, country)
+            for name in _list_dirs(directory, "part-"):
+                if name.endswith(".parquet"):
+                    yield os.path.join(directory, name), int(year), country
+
+
+def _dataset(root, years, countries):
+    """``pyarrow.dataset`` des fichiers retenus et filtre des pays, ou ``(None, None)``."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = read_schema(root)
+    files = [path for path, _, _ in _files(root, schema, years, countries)]
+    if not files:
+        return None, None
+
+    keys = [("Year", pa.int64())]
+    if schema["by_country"]:
+        keys.append(("Country", pa.string()))
+    dataset = ds.dataset(
+        files, format="parquet", partition_base_dir=root,
+        partitioning=ds.partitioning(pa.schema(keys), flavor="hive"),
+    )
+    row_filter = None
+    if countries is not None and not schema["by_country"]:
+        row_filter = ds.field("Country").isin([str(c) for c in countries])
+    return dataset, row_filter
+
+
+def read(root, years=None, countries=None, columns=None):
+    """Lit les partitions de ``years`` / ``countries`` (toutes par défaut), colonnes ``columns``.
+
+    Les fichiers retenus sont lus en un seul appel ``pyarrow.dataset`` (en
+    parallèle), qui reconstitue ``Year`` / ``Country`` depuis les noms de
+    répertoires.
+    """
+    import pandas as pd
+
+    columns = list(read_schema(root)["columns"] if columns is None else columns)
+    dataset, row_filter = _dataset(root, years, countries)
+    if dataset is None:
+        return pd.DataFrame(columns=columns)
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+
+
+def iter_batches(root, years=None, countries=None, columns=None, batch_rows=100_000):
+    """Comme ``read``, mais par DataFrames d'au plus ``batch_rows`` lignes (groupes de
+    lignes parquet), sans charger toute la sélection."""
+    columns = list(read_schema(root)["columns"] if columns is None else columns)
+    dataset, row_filter = _dataset(root, years, countries)
+    if dataset is None:
+        return
+    for batch in dataset.to_batches(columns=columns, filter=row_filter, batch_size=batch_rows):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajoute un extrait CSV au jeu partitionné.")
+    parser.add_argument("csv", nargs="?", default="water_pollution_disease.csv")
+    parser.add_argument("--root", default="data")
+    parser.add_argument("--by-country", action="store_true")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    write(pd.read_csv(args.csv), args.root, by_country=args.by_country)
+    print(f"✅ partitions ajoutées dans {args.root} (version {layout_version(args.root)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Préchargement en arrière-plan des sélections probables.
+
+Après chaque vue servie, les années voisines et les pays les plus demandés sont
+calculés dans un thread de basse priorité (sélection, agrégats de ``rollups``
+et esquisses de quantiles), pour que le clic suivant tombe sur les caches. Le
+thread respecte un budget CPU (fraction du temps passé à calculer) et un budget
+mémoire (taille des caches qu'il remplit : sélections, agrégats, esquisses).
+Les taux de réussite sont journalisés au niveau INFO après chaque vue.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+import rollups
+import sketches
+import water_data
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    def __init__(self, year_radius=1, top_countries=3, cpu_budget=0.25,
+                 memory_budget=64 * 1024 * 1024):
+        if not 0 < cpu_budget <= 1:
+            raise ValueError(f"cpu_budget doit être dans ]0, 1] : {cpu_budget}")
+        self.year_radius = year_radius
+        self.top_countries = top_countries
+        self.cpu_budget = cpu_budget
+        self.memory_budget = memory_budget
+        self.requests = Counter()
+        self._pending = []
+        self._wakeup = threading.Condition()
+        self._thread = None
+
+    def candidates(self, year, country):
+        """Sélections à réchauffer après avoir servi ``(year, country)``, par priorité."""
+        years = water_data.years()
+        i = years.index(year) if year in years else None
+        neighbours = [] if i is None else [
+            years[j]
+            for step in range(1, self.year_radius + 1)
+            for j in (i + step, i - step)
+            if 0 <= j < len(years)
+        ]
+        countries = [c for c, _ in self.requests.most_common(self.top_countries + 1)]
+        countries = [c for c in countries if c != country][: self.top_countries]
+
+        keys = [(y, country) for y in neighbours]
+        keys += [(y, c) for y in [year] + neighbours for c in countries]
+        cached = water_data.cached_views()
+        return [
+            (y, c) for y, c in dict.fromkeys(keys)
+            if (y, None if c in water_data.ALL_COUNTRIES else c) not in cached
+        ]
+
+    def record(self, year, country):
+        """Signale la vue servie et planifie le préchargement de ses voisines."""
+        self.requests[country] += 1
+        keys = self.candidates(year, country)
+        with self._wakeup:
+            # Les candidats d'un clic précédent ne sont plus pertinents.
+            self._pending = keys
+            self._wakeup.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+
+    def _lower_priority(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+
+    def cache_nbytes(self):
+        """Octets occupés par les caches que le préchargement remplit."""
+        return water_data.cache_nbytes() + rollups.cache_nbytes() + sketches.cache_nbytes()
+
+    def _run(self):
+        self._lower_priority()
+        while True:
+            with self._wakeup:
+                while not self._pending:
+                    self._wakeup.wait()
+                year, country = self._pending.pop(0)
+
+            if self.cache_nbytes() >= self.memory_budget:
+                continue
+            start = time.perf_counter()
+            try:
+                water_data.selection(year, country, prefetch=True)
+                rollups.countries(year)
+                sketches.year_sketches(year)
+            except Exception:
+                logger.exception("préchargement de %s / %s impossible", year, country)
+            elapsed = time.perf_counter() - start
+            time.sleep(elapsed * (1 - self.cpu_budget) / self.cpu_budget)
+
+    def stats(self):
+        """Compteurs du cache et taux de réussite du préchargement."""
+        stats = dict(water_data.CACHE_STATS)
+        requests = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / requests if requests else 0.0
+        stats["prefetch_hit_rate"] = (
+            stats["prefetch_hits"] / stats["prefetched"] if stats["prefetched"] else 0.0
+        )
+        return stats
+
+
+prefetcher = Prefetcher()
+
+
+def record(year, country):
+    prefetcher.record(year, country)
+    logger.info("cache des sélections : %s", prefetcher.stats())
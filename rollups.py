@@ -0,0 +1,94 @@
+"""Agrégats hiérarchiques Monde → Pays → Région × Année, précalculés une fois par année.
+
+Les sommes et effectifs sont calculés au niveau le plus fin (Année, Pays,
+Région) puis remontés par addition, ce qui donne des moyennes exactes à
+chaque niveau. Quand un jeu est publié en mémoire partagée, ce niveau fin est
+lu directement dans son cube. C'est la seule source des moyennes par pays des
+apps : chaque niveau est un seul DataFrame indexé par ses clés, et chaque zoom
+une lecture ``.loc`` dans l'index, sans ``groupby`` sur les données brutes.
+"""
+
+import threading
+
+import water_data
+
+LEVELS = {
+    "region": ["Year", "Country", "Region"],
+    "country": ["Year", "Country"],
+    "world": ["Year"],
+}
+
+_lock = threading.Lock()
+# année -> (version des données de l'année, agrégats)
+_cache = {}
+
+
+def aggregate(df):
+    """Sommes, effectifs non manquants et nombre de lignes par (Année, Pays, Région)."""
+    columns = [c for c in df.select_dtypes("number").columns if c != "Year"]
+    base = df.groupby(LEVELS["region"], observed=True)[columns]
+    return base.sum(), base.count(), base.size()
+
+
+def roll_up(sums, counts, sizes):
+    """Moyennes de chaque niveau, un seul DataFrame indexé par ses clés (``LEVELS``)."""
+    rollups = {}
+    for level, keys in LEVELS.items():
+        level_sums = sums.groupby(level=keys, observed=True).sum()
+        level_counts = counts.groupby(level=keys, observed=True).sum()
+        means = level_sums / level_counts.where(level_counts > 0)
+        means["Records"] = sizes.groupby(level=keys, observed=True).sum()
+        rollups[level] = means
+    return rollups
+
+
+def build_rollups(df):
+    """Agrégats de tous les niveaux à partir des lignes brutes ``df``."""
+    return roll_up(*aggregate(df))
+
+
+def _rollups(year):
+    # Construits une fois par année et par version des données de l'année : depuis
+    # le cube partagé s'il existe, sinon à partir des seules lignes de l'année.
+    version = water_data.year_version(year)
+    with _lock:
+        cached = _cache.get(year)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    shared = water_data.shared_dataset()
+    if shared is not None:
+        built = roll_up(*shared.cube_aggregates(year))
+    else:
+        built = build_rollups(water_data.year_frame(year))
+    with _lock:
+        cached = _cache.get(year)
+        if cached is None or cached[0] != version:
+            _cache[year] = cached = (version, built)
+        return cached[1]
+
+
+def _nbytes(value):
+    usage = value.memory_usage(deep=True)
+    return int(usage if isinstance(usage, int) else usage.sum())
+
+
+def cache_nbytes():
+    """Octets occupés par les agrégats en cache."""
+    with _lock:
+        built = [levels for _, levels in _cache.values()]
+    return sum(_nbytes(frame) for levels in built for frame in levels.values())
+
+
+def world(year):
+    """Moyennes mondiales de ``year``."""
+    return _rollups(year)["world"].loc[year]
+
+
+def countries(year):
+    """Moyennes par pays de ``year`` (une ligne par pays)."""
+    return _rollups(year)["country"].loc[year]
+
+
+def regions(year, country):
+    """Moyennes par région de ``country`` pour ``year``."""
+    return _rollups(year)["region"].loc[(year, country)]
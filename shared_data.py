@@ -0,0 +1,279 @@
+"""Publication du jeu de données en mémoire partagée pour plusieurs workers Streamlit.
+
+Un publieur écrit dans un répertoire de génération sous ``/dev/shm`` :
+
+- les colonnes (tableaux numpy, codes de catégories pour le texte), triées par
+  (Année, Pays) avec les bornes de chaque tranche, pour que chaque sélection
+  soit une vue ``iloc`` sans copie ;
+- le cube Année × Pays × Région des sommes et effectifs, dont ``rollups.py``
+  tire tous ses niveaux d'agrégation ;
+- la table des tendances (``trends.py``) et les esquisses de quantiles
+  (``sketches.py``).
+
+Chaque worker les ouvre en ``mmap`` lecture seule : une seule copie en mémoire
+par nœud, quel que soit le nombre de processus.
+
+Une nouvelle génération est écrite à côté de l'ancienne, puis le fichier
+``CURRENT`` est remplacé atomiquement ; les workers la prennent au prochain
+``attach()``.
+
+    python shared_data.py [--root DIR] [water_pollution_disease.csv]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from startup import lazy_import
+
+np = lazy_import("numpy")
+
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+
+# Niveau le plus fin du cube agrégé.
+CUBE_KEYS = ["Year", "Country", "Region"]
+
+
+def _default_root():
+    if os.environ.get("WATER_DASHBOARD_SHM"):
+        return os.environ["WATER_DASHBOARD_SHM"]
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "water-dashboard")
+
+
+DEFAULT_ROOT = _default_root()
+
+
+def current_generation(root=DEFAULT_ROOT):
+    """Nom de la génération publiée, ou ``None`` si rien n'a été publié."""
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_array(directory, name, values):
+    np.save(os.path.join(directory, name + ".npy"), np.ascontiguousarray(values))
+    return name + ".npy"
+
+
+def _write_frame(directory, prefix, df):
+    """Écrit les colonnes de ``df`` (codes de catégories pour le texte) ; renvoie leur description."""
+    import pandas as pd
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        values = df[name]
+        if pd.api.types.is_numeric_dtype(values):
+            file = _write_array(directory, f"{prefix}{i}", values.to_numpy())
+            columns.append({"name": name, "kind": "numeric", "file": file})
+        else:
+            cat = pd.Categorical(values)
+            file = _write_array(directory, f"{prefix}{i}", cat.codes)
+            columns.append({
+                "name": name, "kind": "category", "file": file,
+                "categories": [str(c) for c in cat.categories],
+            })
+    return columns
+
+
+def _row_offsets(df):
+    """``{année: {"rows": [début, fin], "countries": {pays: [début, fin]}}}`` de ``df`` trié."""
+    sizes = df.groupby(["Year", "Country"], sort=False, dropna=False).size()
+    stops = np.cumsum(sizes.to_numpy())
+    offsets = {}
+    for (year, country), start, stop in zip(sizes.index, stops - sizes.to_numpy(), stops):
+        entry = offsets.setdefault(str(int(year)), {"rows": [int(start), int(start)],
+                                                    "countries": {}})
+        entry["rows"][1] = int(stop)
+        entry["countries"][str(country)] = [int(start), int(stop)]
+    return offsets
+
+
+def _write_sketches(directory, sketches):
+    keys, columns = sketches.arrays()
+    described = []
+    for i, (name, arrays) in enumerate(columns.items()):
+        files = {field: _write_array(directory, f"sketch{i}_{field}", values)
+                 for field, values in arrays.items()}
+        described.append({"name": name, **files})
+    return {
+        "compression": sketches.compression,
+        "years": [int(year) for year, _ in keys],
+        "countries": [str(country) for _, country in keys],
+        "columns": described,
+    }
+
+
+def publish(df, root=DEFAULT_ROOT, keep=2):
+    """Publie ``df``, son cube agrégé, ses tendances et ses esquisses de quantiles
+    comme nouvelle génération ; renvoie son nom."""
+    import pandas as pd
+
+    import sketches
+    import trends
+
+    os.makedirs(root, exist_ok=True)
+    generation = f"gen-{time.time_ns()}-{os.getpid()}"
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+
+    # Trié par (Année, Pays) : chaque sélection est une tranche contiguë des colonnes.
+    df = df.sort_values(["Year", "Country"], kind="stable", ignore_index=True)
+    columns = _write_frame(tmp_dir, "col", df)
+
+    numeric = [c["name"] for c in columns if c["kind"] == "numeric" and c["name"] != "Year"]
+    grouped = df.groupby(CUBE_KEYS)[numeric]
+    years = sorted(int(y) for y in df["Year"].unique())
+    countries = sorted(str(c) for c in df["Country"].unique())
+    regions = sorted(str(r) for r in df["Region"].unique())
+    index = pd.MultiIndex.from_product([years, countries, regions], names=CUBE_KEYS)
+    shape = (len(years), len(countries), len(regions))
+    sums = grouped.sum().reindex(index, fill_value=0).to_numpy(dtype="f8")
+    counts = grouped.count().reindex(index, fill_value=0).to_numpy(dtype="i8")
+    sizes = grouped.size().reindex(index, fill_value=0).to_numpy(dtype="i8")
+    cube = {
+        "years": years,
+        "countries": countries,
+        "regions": regions,
+        "columns": numeric,
+        "sums": _write_array(tmp_dir, "cube_sums", sums.reshape(*shape, len(numeric))),
+        "counts": _write_array(tmp_dir, "cube_counts", counts.reshape(*shape, len(numeric))),
+        "sizes": _write_array(tmp_dir, "cube_sizes", sizes.reshape(shape)),
+    }
+
+    manifest = {
+        "generation": generation,
+        "columns": columns,
+        "rows": _row_offsets(df),
+        "cube": cube,
+        "trends": _write_frame(tmp_dir, "trend", trends.compute_trends(df)),
+        "sketches": _write_sketches(tmp_dir, sketches.build_sketches([df])),
+    }
+    with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f)
+    os.rename(tmp_dir, os.path.join(root, generation))
+
+    pointer = os.path.join(root, f".{CURRENT}-{generation}")
+    with open(pointer, "w") as f:
+        f.write(generation)
+    os.replace(pointer, os.path.join(root, CURRENT))
+
+    _prune(root, keep)
+    return generation
+
+
+def _prune(root, keep):
+    # Les workers encore attachés à une ancienne génération gardent leurs mmaps
+    # valides après suppression des fichiers.
+    generations = sorted(
+        (d for d in os.listdir(root) if d.startswith("gen-")),
+        key=lambda d: int(d.split("-")[1]),
+    )
+    for old in generations[:-keep]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+
+class SharedDataset:
+    """Vue lecture seule, sans copie, d'une génération publiée."""
+
+    def __init__(self, root, generation):
+        import pandas as pd
+
+        self.root = root
+        self.generation = generation
+        directory = os.path.join(root, generation)
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+
+        def load(file):
+            return np.load(os.path.join(directory, file), mmap_mode="r")
+
+        def load_frame(columns):
+            data = {}
+            for column in columns:
+                values = load(column["file"])
+                if column["kind"] == "category":
+                    values = pd.Categorical.from_codes(
+                        values, categories=column["categories"], validate=False
+                    )
+                data[column["name"]] = values
+            return pd.DataFrame(data, copy=False)
+
+        self.frame = load_frame(manifest["columns"])
+        self.offsets = manifest["rows"]
+        self.trends = load_frame(manifest["trends"])
+
+        sketches = manifest["sketches"]
+        self.sketch_keys = list(zip(sketches["years"], sketches["countries"]))
+        self.sketch_compression = sketches["compression"]
+        self.sketch_arrays = {
+            column["name"]: {field: load(file) for field, file in column.items() if field != "name"}
+            for column in sketches["columns"]
+        }
+
+        cube = manifest["cube"]
+        self.years = cube["years"]
+        self.countries = cube["countries"]
+        self.regions = cube["regions"]
+        self.cube_columns = cube["columns"]
+        self.cube_sums = load(cube["sums"])
+        self.cube_counts = load(cube["counts"])
+        self.cube_sizes = load(cube["sizes"])
+
+    def rows(self, year, country=None):
+        """Lignes de ``year`` (et ``country``) : une tranche ``iloc`` des colonnes, sans copie."""
+        entry = self.offsets.get(str(int(year)))
+        if entry is None:
+            return self.frame.iloc[0:0]
+        start, stop = entry["rows"] if country is None else entry["countries"].get(
+            str(country), (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def cube_aggregates(self, year):
+        """Sommes, effectifs non manquants et nombre de lignes par (Année, Pays, Région)
+        pour ``year`` (cellules sans ligne exclues)."""
+        import pandas as pd
+
+        i = self.years.index(int(year))
+        country, region = np.nonzero(self.cube_sizes[i] > 0)
+        index = pd.MultiIndex.from_arrays(
+            [np.full(country.size, int(year)), np.asarray(self.countries)[country],
+             np.asarray(self.regions)[region]],
+            names=CUBE_KEYS,
+        )
+        sums = pd.DataFrame(self.cube_sums[i][country, region], index=index,
+                            columns=self.cube_columns)
+        counts = pd.DataFrame(self.cube_counts[i][country, region], index=index,
+                              columns=self.cube_columns)
+        sizes = pd.Series(self.cube_sizes[i][country, region], index=index)
+        return sums, counts, sizes
+
+
+def attach(root=DEFAULT_ROOT, generation=None):
+    """S'attache à ``generation`` (par défaut la génération courante), ou ``None``."""
+    generation = generation or current_generation(root)
+    if generation is None:
+        return None
+    return SharedDataset(root, generation)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publie le CSV en mémoire partagée.")
+    parser.add_argument("csv", nargs="?", default="water_pollution_disease.csv")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--keep", type=int, default=2)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    generation = publish(pd.read_csv(args.csv), root=args.root, keep=args.keep)
+    print(f"✅ {generation} publiée dans {args.root}")
+
+
+if __name__ == "__main__":
+    main()
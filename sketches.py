@@ -0,0 +1,248 @@
+"""Esquisses de quantiles fusionnables (t-digest) par (Année, Pays).
+
+Une esquisse par groupe et par colonne numérique est construite par morceaux
+(``GroupedSketches.add_chunk``) et gardée par année : quand une nouvelle version
+du jeu arrive (partitions ajoutées, nouvelle génération), seules les années
+dont les données ont changé sont reconstruites, hors verrou, en parcourant
+leurs seules lignes par morceaux (``water_data.iter_year_chunks``). Les médianes / p90 / p95 d'une sélection s'obtiennent en
+fusionnant les esquisses des groupes concernés : mémoire bornée à
+~``COMPRESSION`` centroïdes par groupe, erreur de rang de l'ordre de
+``1 / COMPRESSION`` (plus fine aux extrémités).
+"""
+
+import threading
+
+import water_data
+from startup import lazy_import
+
+np = lazy_import("numpy")
+
+COMPRESSION = 100
+
+KPI_QUANTILES = (0.5, 0.9, 0.95)
+
+_lock = threading.Lock()
+# année -> (version des données de l'année, GroupedSketches)
+_cache = {}
+# Esquisses publiées avec la génération en mémoire partagée (toutes années).
+_shared = {"generation": None, "sketches": None}
+
+
+def _compress(groups, means, weights, compression):
+    """Regroupe les centroïdes de chaque groupe par unité de k1(q) = δ/2π · asin(2q − 1).
+
+    Tous les groupes sont traités ensemble : petits centroïdes aux extrémités,
+    plus gros autour de la médiane. Renvoie les tableaux triés par (groupe, moyenne).
+    """
+    order = np.lexsort((means, groups))
+    groups, means, weights = groups[order], means[order], weights[order]
+    group_starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[group_starts, groups.size])
+
+    cumulative = np.cumsum(weights)
+    before = np.repeat(cumulative[group_starts] - weights[group_starts], sizes)
+    totals = np.repeat(np.add.reduceat(weights, group_starts), sizes)
+    q_left = (cumulative - weights - before) / totals
+    k = compression / (2 * np.pi) * np.arcsin(np.clip(2 * q_left - 1, -1, 1))
+    bucket = np.floor(k + compression / 4).astype(np.int64)
+
+    starts = np.flatnonzero(
+        np.r_[True, (groups[1:] != groups[:-1]) | (bucket[1:] != bucket[:-1])]
+    )
+    merged_weights = np.add.reduceat(weights, starts)
+    merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+    return groups[starts], merged_means, merged_weights
+
+
+class QuantileSketch:
+    """t-digest à fusion : centroïdes (moyenne, poids) triés, plus min et max exacts."""
+
+    def __init__(self, compression=COMPRESSION, means=None, weights=None, low=None, high=None):
+        self.compression = compression
+        self.means = np.empty(0) if means is None else means
+        self.weights = np.empty(0) if weights is None else weights
+        self.min = np.inf if low is None else low
+        self.max = -np.inf if high is None else high
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _compress(self, means, weights):
+        _, self.means, self.weights = _compress(
+            np.zeros(means.size, dtype=np.int64), means, weights, self.compression
+        )
+
+    def add(self, values):
+        values = np.asarray(values, dtype="f8")
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(values.size)]))
+        return self
+
+    @classmethod
+    def merge(cls, sketches, compression=COMPRESSION):
+        merged = cls(compression)
+        sketches = [s for s in sketches if s.weights.size]
+        if sketches:
+            merged.min = min(s.min for s in sketches)
+            merged.max = max(s.max for s in sketches)
+            merged._compress(np.concatenate([s.means for s in sketches]),
+                             np.concatenate([s.weights for s in sketches]))
+        return merged
+
+    def quantile(self, q):
+        """Estimation du quantile ``q`` (scalaire ou tableau), ``nan`` si l'esquisse est vide."""
+        if not self.weights.size:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xs = np.r_[0.0, centers, total]
+        ys = np.r_[self.min, self.means, self.max]
+        return np.interp(np.asarray(q) * total, xs, ys)
+
+
+class GroupedSketches:
+    """Une esquisse par (Année, Pays) et par colonne, stockées en tableaux contigus."""
+
+    def __init__(self, compression=COMPRESSION):
+        self.compression = compression
+        self.keys = []
+        self._ids = {}
+        self._centroids = {}
+        self._bounds = {}
+
+    def _group_ids(self, chunk):
+        import pandas as pd
+
+        codes, uniques = pd.MultiIndex.from_arrays(
+            [chunk["Year"].astype("int64"), chunk["Country"].astype(str)]
+        ).factorize()
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, key in enumerate(uniques):
+            if key not in self._ids:
+                self._ids[key] = len(self.keys)
+                self.keys.append(key)
+            mapping[i] = self._ids[key]
+        return mapping[codes]
+
+    def add_chunk(self, chunk):
+        """Ajoute un morceau de données : une seule compression vectorisée par colonne."""
+        ids = self._group_ids(chunk)
+        n = len(self.keys)
+        columns = [c for c in chunk.select_dtypes("number").columns if c != "Year"]
+        for column in columns:
+            values = chunk[column].to_numpy(dtype="f8")
+            valid = ~np.isnan(values)
+            groups, values = ids[valid], values[valid]
+
+            lo, hi = self._bounds.get(column, (np.empty(0), np.empty(0)))
+            lo = np.r_[lo, np.full(n - lo.size, np.inf)]
+            hi = np.r_[hi, np.full(n - hi.size, -np.inf)]
+            np.minimum.at(lo, groups, values)
+            np.maximum.at(hi, groups, values)
+            self._bounds[column] = (lo, hi)
+
+            old = self._centroids.get(column)
+            if old is not None:
+                groups = np.r_[old[0], groups]
+                values = np.r_[old[1], values]
+                weights = np.r_[old[2], np.ones(valid.sum())]
+            else:
+                weights = np.ones(values.size)
+            if values.size:
+                self._centroids[column] = _compress(groups, values, weights, self.compression)
+        return self
+
+    def arrays(self):
+        """Clés et tableaux par colonne (centroïdes triés par groupe, bornes par groupe)."""
+        columns = {}
+        for column, (groups, means, weights) in self._centroids.items():
+            lo, hi = self._bounds[column]
+            columns[column] = {"groups": groups, "means": means, "weights": weights,
+                               "min": lo, "max": hi}
+        return list(self.keys), columns
+
+    @classmethod
+    def from_arrays(cls, keys, columns, compression=COMPRESSION):
+        """Inverse d'``arrays`` ; les tableaux peuvent être des ``mmap`` lecture seule."""
+        sketches = cls(compression)
+        sketches.keys = list(keys)
+        sketches._ids = {key: i for i, key in enumerate(sketches.keys)}
+        for column, arrays in columns.items():
+            sketches._centroids[column] = (arrays["groups"], arrays["means"], arrays["weights"])
+            sketches._bounds[column] = (arrays["min"], arrays["max"])
+        return sketches
+
+    @property
+    def nbytes(self):
+        arrays = [a for arrays in self._centroids.values() for a in arrays]
+        arrays += [a for arrays in self._bounds.values() for a in arrays]
+        return sum(a.nbytes for a in arrays)
+
+    def sketch(self, key, column):
+        """Esquisse du groupe ``key`` = (année, pays) pour ``column``."""
+        gid = self._ids.get(key)
+        if gid is None or column not in self._centroids:
+            return QuantileSketch(self.compression)
+        groups, means, weights = self._centroids[column]
+        lo, hi = np.searchsorted(groups, gid, "left"), np.searchsorted(groups, gid, "right")
+        bounds = self._bounds[column]
+        return QuantileSketch(self.compression, means[lo:hi], weights[lo:hi],
+                              bounds[0][gid], bounds[1][gid])
+
+
+def build_sketches(chunks, compression=COMPRESSION):
+    """Construit les esquisses par (Année, Pays) à partir d'un flux de DataFrames."""
+    sketches = GroupedSketches(compression)
+    for chunk in chunks:
+        sketches.add_chunk(chunk)
+    return sketches
+
+
+def _shared_sketches(shared):
+    with _lock:
+        if _shared["generation"] != shared.generation:
+            _shared.update(generation=shared.generation, sketches=GroupedSketches.from_arrays(
+                shared.sketch_keys, shared.sketch_arrays, shared.sketch_compression))
+        return _shared["sketches"]
+
+
+def year_sketches(year):
+    """Esquisses des pays de ``year``, reconstruites seulement si les données de l'année
+    changent ; lues dans la génération publiée en mémoire partagée s'il y en a une."""
+    shared = water_data.shared_dataset()
+    if shared is not None:
+        return _shared_sketches(shared)
+    year = int(year)
+    version = water_data.year_version(year)
+    with _lock:
+        cached = _cache.get(year)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    built = build_sketches(water_data.iter_year_chunks(year))
+    with _lock:
+        cached = _cache.get(year)
+        if cached is None or cached[0] != version:
+            _cache[year] = cached = (version, built)
+        return cached[1]
+
+
+def cache_nbytes():
+    """Octets occupés par les esquisses en cache (hors esquisses publiées en mémoire partagée)."""
+    with _lock:
+        return sum(sketches.nbytes for _, sketches in _cache.values())
+
+
+def quantiles(year, country, column, qs=KPI_QUANTILES):
+    """Quantiles ``qs`` de ``column`` pour la sélection, par fusion des esquisses de groupes."""
+    sketches = year_sketches(year)
+    if country in water_data.ALL_COUNTRIES:
+        keys = [key for key in sketches.keys if key[0] == int(year)]
+    else:
+        keys = [(int(year), str(country))]
+    merged = QuantileSketch.merge(sketches.sketch(key, column) for key in keys)
+    return dict(zip(qs, merged.quantile(qs)))
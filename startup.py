@@ -0,0 +1,66 @@
+"""Imports paresseux et mesure du temps de premier affichage.
+
+Les modules lourds (``plotly.express``, ``numpy``, ``pandas``) ne sont chargés
+qu'au premier accès à un de leurs attributs, pour que l'en-tête de la page
+s'affiche avant. ``mark()`` note, une fois par processus, le temps écoulé
+depuis le démarrage du processus (``boot.py`` le transmet via
+``WATER_DASHBOARD_BOOT_T0``, sinon il est lu dans ``/proc/self/stat``). Les
+temps sont gardés dans ``TIMINGS`` et journalisés au niveau INFO : visibles
+avec ``boot.py``, qui configure la journalisation ; ``streamlit run`` seul ne
+les affiche pas.
+"""
+
+import importlib
+import logging
+import os
+import sys
+import time
+import types
+
+logger = logging.getLogger(__name__)
+
+BOOT_T0_ENV = "WATER_DASHBOARD_BOOT_T0"
+
+
+def _process_start_time():
+    """Heure (epoch) de création du processus, ou ``None`` hors Linux."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        ticks_per_second = os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+    return time.time() - (uptime - start_ticks / ticks_per_second)
+
+
+T0 = float(os.environ[BOOT_T0_ENV]) if BOOT_T0_ENV in os.environ else _process_start_time()
+
+# Secondes écoulées depuis T0 à la première occurrence de chaque étape.
+TIMINGS = {}
+
+
+class _LazyModule(types.ModuleType):
+    # ``importlib.util.LazyLoader`` n'est pas sûr entre threads avant Python
+    # 3.12.3 ; ``import_module`` prend le verrou d'import du module, donc deux
+    # sessions (ou le thread de préchargement) peuvent y arriver en même temps.
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self.__name__), attr)
+
+
+def lazy_import(name):
+    """Renvoie le module ``name``, chargé seulement au premier accès à un attribut."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return _LazyModule(name)
+
+
+def mark(step):
+    """Enregistre la première atteinte de ``step`` (ex. ``"shell"``, ``"first_chart"``)."""
+    if T0 is None:
+        return None
+    if step not in TIMINGS:
+        TIMINGS[step] = time.time() - T0
+        logger.info("⏱️ %s : %.2f s depuis le démarrage", step, TIMINGS[step])
+    return TIMINGS[step]
@@ -0,0 +1,90 @@
+import base64
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+
+from figure_payload import FLOAT32_DECIMALS, compact_figure, downcast, typed_array
+
+
+def decode(spec):
+    values = np.frombuffer(base64.b64decode(spec["bdata"]), dtype=spec["dtype"])
+    if "shape" in spec:
+        values = values.reshape([int(n) for n in spec["shape"].split(", ")])
+    return values
+
+
+def test_downcast_keeps_csv_precision_in_float32():
+    rng = np.random.default_rng(0)
+    values = np.round(rng.uniform(0, 10_000, 5_000), 2)
+    small = downcast(values)
+    assert small.dtype == np.float32
+    np.testing.assert_array_equal(
+        np.round(small.astype("f8"), FLOAT32_DECIMALS), np.round(values, FLOAT32_DECIMALS)
+    )
+
+
+def test_downcast_keeps_float64_when_float32_would_show():
+    values = np.array([1234567.891, 0.5, 1.25])
+    assert downcast(values).dtype == np.float64
+    assert downcast(np.array([1e39, 1.0])).dtype == np.float64
+
+
+def test_downcast_keeps_nan():
+    values = np.array([1.5, np.nan, 2.25])
+    np.testing.assert_array_equal(downcast(values), values)
+
+
+@pytest.mark.parametrize("values, dtype", [
+    (np.array([0, 200]), "u1"),
+    (np.array([-5, 100]), "i1"),
+    (np.array([0, 60_000]), "u2"),
+    (np.array([-1, 100_000]), "i4"),
+    (np.array([True, False]), "u1"),
+])
+def test_downcast_picks_smallest_integer_type(values, dtype):
+    small = downcast(values)
+    assert small.dtype == np.dtype(dtype)
+    np.testing.assert_array_equal(small, values)
+
+
+def test_downcast_falls_back_to_float64_for_int64_range():
+    values = np.array([0, 2**40])
+    assert downcast(values).dtype == np.float64
+
+
+def test_typed_array_round_trips():
+    values = np.arange(24, dtype="f8").reshape(4, 6) / 4
+    spec = typed_array(values)
+    assert spec["dtype"] == "f4"
+    assert spec["shape"] == "4, 6"
+    np.testing.assert_array_equal(decode(spec), values)
+
+
+def test_compact_figure_drops_unused_customdata():
+    df = pd.DataFrame({"x": range(20), "y": range(20), "a": range(20), "b": range(20, 40)})
+    fig = px.scatter(df, x="x", y="y", hover_data=["a", "b"])
+    fig.update_traces(hovertemplate="x=%{x}<br>b=%{customdata[1]}")
+
+    trace = compact_figure(fig).data[0].to_plotly_json()
+    assert trace["hovertemplate"] == "x=%{x}<br>b=%{customdata[0]}"
+    np.testing.assert_array_equal(decode(trace["customdata"]).ravel(), df["b"])
+    np.testing.assert_array_equal(decode(trace["y"]), df["y"])
+
+
+def test_plotly_chart_measures_once_per_data_shape(monkeypatch):
+    import streamlit as st
+
+    import figure_payload
+
+    calls = []
+    monkeypatch.setattr(st, "plotly_chart", lambda fig, **kwargs: None)
+    monkeypatch.setattr(figure_payload, "payload_nbytes",
+                        lambda fig: calls.append(fig) or len(calls))
+    df = pd.DataFrame({"x": range(40), "y": range(40)})
+
+    for rows in (40, 40, 20, 40):
+        figure_payload.plotly_chart(px.line(df.head(rows), x="x", y="y", title="same title"))
+    assert len(calls) == 4
+    assert figure_payload.PAYLOAD_STATS["same title"] == {"plain_bytes": 3, "compact_bytes": 4}
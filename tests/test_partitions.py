@@ -0,0 +1,114 @@
+import os
+
+import pandas as pd
+import pyarrow.dataset
+import pytest
+
+import partitions
+
+
+def extract(year, countries=("India", "Côte d'Ivoire")):
+    rows = [(country, region, year, float(i))
+            for i, (country, region) in enumerate(
+                (c, r) for c in countries for r in ("North", "South"))]
+    return pd.DataFrame(rows, columns=["Country", "Region", "Year", "Lead"])
+
+
+@pytest.fixture(params=[False, True], ids=["by-year", "by-country"])
+def root(request, tmp_path):
+    root = str(tmp_path / "data")
+    partitions.write(pd.concat([extract(2019), extract(2020)]), root, by_country=request.param)
+    return root
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Fichiers passés à ``pyarrow.dataset`` par ``partitions.read``."""
+    files = []
+    original = pyarrow.dataset.dataset
+
+    def spy(source, **kwargs):
+        files.extend(source)
+        return original(source, **kwargs)
+
+    monkeypatch.setattr(pyarrow.dataset, "dataset", spy)
+    return files
+
+
+def test_round_trip(root):
+    df = partitions.read(root)
+    expected = pd.concat([extract(2019), extract(2020)])
+    pd.testing.assert_frame_equal(
+        df.sort_values(["Year", "Country", "Region"]).reset_index(drop=True),
+        expected.sort_values(["Year", "Country", "Region"]).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_year_and_country_pruning(root, opened):
+    df = partitions.read(root, years=[2020], countries=["Côte d'Ivoire"])
+    assert set(df["Year"]) == {2020}
+    assert set(df["Country"]) == {"Côte d'Ivoire"}
+    assert len(df) == 2
+    assert all(f"{os.sep}Year=2020{os.sep}" in path for path in opened)
+    if partitions.read_schema(root)["by_country"]:
+        assert len(opened) == 1 and "Country=C%C3%B4te" in opened[0]
+
+
+def test_column_projection(root):
+    df = partitions.read(root, years=[2019], columns=["Lead", "Year"])
+    assert list(df.columns) == ["Lead", "Year"]
+    assert len(df) == 4
+
+
+def test_append_keeps_existing_files(root):
+    before = {}
+    for path, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(".parquet"):
+                full = os.path.join(path, name)
+                before[full] = os.stat(full).st_mtime_ns
+    version = partitions.layout_version(root)
+
+    partitions.write(extract(2021), root, by_country=partitions.read_schema(root)["by_country"])
+
+    for path, mtime in before.items():
+        assert os.stat(path).st_mtime_ns == mtime
+    assert partitions.layout_version(root) != version
+    assert partitions.partition_years(root) == [2019, 2020, 2021]
+    assert len(partitions.read(root, years=[2021])) == 4
+
+
+def test_schema_mismatch(root):
+    by_country = partitions.read_schema(root)["by_country"]
+    with pytest.raises(ValueError, match="schéma incompatible"):
+        partitions.write(extract(2021).drop(columns="Region"), root, by_country=by_country)
+    with pytest.raises(ValueError, match="schéma incompatible"):
+        partitions.write(extract(2021), root, by_country=not by_country)
+
+
+def test_empty_result(root, opened):
+    df = partitions.read(root, years=[1999], columns=["Country", "Lead"])
+    assert df.empty
+    assert list(df.columns) == ["Country", "Lead"]
+    assert opened == []
+
+
+def test_year_token_changes_only_for_appended_years(root):
+    tokens = {year: partitions.year_token(root, year) for year in (2019, 2020)}
+    assert os.path.exists(os.path.join(root, "Year=2019", partitions.VERSION))
+
+    partitions.write(extract(2020, countries=("Chile",)), root,
+                     by_country=partitions.read_schema(root)["by_country"])
+
+    assert partitions.year_token(root, 2019) == tokens[2019]
+    assert partitions.year_token(root, 2020) != tokens[2020]
+
+
+def test_iter_batches_bounds_batch_size(root):
+    batches = list(partitions.iter_batches(root, years=[2020], countries=["India"],
+                                           columns=["Country", "Lead"], batch_rows=1))
+    assert [len(batch) for batch in batches] == [1, 1]
+    assert all(list(batch.columns) == ["Country", "Lead"] for batch in batches)
+    assert {c for batch in batches for c in batch["Country"]} == {"India"}
+    assert list(partitions.iter_batches(root, years=[1999])) == []
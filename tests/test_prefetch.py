@@ -0,0 +1,74 @@
+import os
+from collections import OrderedDict
+
+import pytest
+
+import prefetch
+import water_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(water_data, "_views", OrderedDict())
+    monkeypatch.setattr(water_data, "CACHE_STATS", dict.fromkeys(water_data.CACHE_STATS, 0))
+
+
+def test_candidates_prioritise_neighbours_then_popular_countries(monkeypatch):
+    monkeypatch.setattr(water_data, "years", lambda: [2000, 2001, 2002, 2003, 2004])
+    monkeypatch.setattr(water_data, "cached_views", lambda: {(2001, None), (2003, "India")})
+    prefetcher = prefetch.Prefetcher(year_radius=1, top_countries=2)
+    prefetcher.requests.update({"India": 3, "Brazil": 2, "Chile": 1, "Tous": 5})
+
+    assert prefetcher.candidates(2002, "Tous") == [
+        (2003, "Tous"),
+        (2002, "India"), (2002, "Brazil"),
+        (2003, "Brazil"),
+        (2001, "India"), (2001, "Brazil"),
+    ]
+    # Pas d'année au-delà de 2004 ; la vue déjà en cache n'est pas reproposée.
+    assert prefetcher.candidates(2004, "India") == [
+        (2004, "Tous"), (2004, "Brazil"), (2003, "Tous"), (2003, "Brazil"),
+    ]
+
+
+@pytest.mark.parametrize("cpu_budget", [0, -0.5, 1.5])
+def test_cpu_budget_must_be_a_fraction(cpu_budget):
+    with pytest.raises(ValueError):
+        prefetch.Prefetcher(cpu_budget=cpu_budget)
+
+
+def test_lru_evicts_least_recently_used(fresh_cache, monkeypatch):
+    views = {year: water_data.selection(year, "Tous") for year in (2000, 2001, 2002)}
+    size = max(int(v.memory_usage(deep=True).sum()) for v in views.values())
+    monkeypatch.setattr(water_data, "VIEW_CACHE_BYTES", 3 * size)
+
+    water_data.selection(2000, "Tous")
+    water_data.selection(2003, "Tous")
+    assert (2001, None) not in water_data.cached_views()
+    assert {(2000, None), (2002, None), (2003, None)} <= water_data.cached_views()
+    assert water_data.cache_nbytes() <= 3 * size
+
+
+def test_prefetch_hits_are_counted_once(fresh_cache):
+    water_data.selection(2010, "India", prefetch=True)
+    water_data.selection(2010, "India", prefetch=True)
+    assert water_data.CACHE_STATS["prefetched"] == 1
+    assert water_data.CACHE_STATS["hits"] == 0
+
+    water_data.selection(2010, "India")
+    water_data.selection(2010, "India")
+    water_data.selection(2011, "India")
+    stats = prefetch.Prefetcher().stats()
+    assert (stats["hits"], stats["misses"], stats["prefetch_hits"]) == (2, 1, 1)
+    assert stats["prefetch_hit_rate"] == 1.0
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_memory_budget_counts_every_cache(monkeypatch):
+    monkeypatch.setattr(water_data, "cache_nbytes", lambda: 10)
+    monkeypatch.setattr(prefetch.rollups, "cache_nbytes", lambda: 20)
+    monkeypatch.setattr(prefetch.sketches, "cache_nbytes", lambda: 30)
+    assert prefetch.Prefetcher().cache_nbytes() == 60
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import rollups
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    df = pd.DataFrame({
+        "Country": rng.choice(["India", "Brazil", "Chile"], n),
+        "Region": rng.choice(["North", "South", "East"], n),
+        "Year": rng.choice([2019, 2020], n),
+        "Lead": rng.random(n),
+    })
+    df.loc[rng.random(n) < 0.1, "Lead"] = np.nan
+    return df
+
+
+def test_levels_match_groupby_means(rows):
+    built = rollups.build_rollups(rows)
+    for level, keys in rollups.LEVELS.items():
+        expected = rows.groupby(keys)["Lead"].mean()
+        pd.testing.assert_series_equal(built[level]["Lead"], expected, check_names=False)
+        assert (built[level]["Records"] == rows.groupby(keys).size()).all()
+
+
+def test_lookups_use_the_per_year_cache(rows, monkeypatch):
+    versions = {2019: "a", 2020: "a"}
+    reads = []
+    monkeypatch.setattr(rollups, "_cache", {})
+    monkeypatch.setattr(rollups.water_data, "year_version", lambda year: versions[year])
+    monkeypatch.setattr(rollups.water_data, "shared_dataset", lambda: None)
+    monkeypatch.setattr(rollups.water_data, "year_frame",
+                        lambda year: reads.append(year) or rows[rows["Year"] == year])
+
+    india = rows[(rows["Year"] == 2019) & (rows["Country"] == "India")]
+    pd.testing.assert_series_equal(
+        rollups.regions(2019, "India")["Lead"], india.groupby("Region")["Lead"].mean(),
+        check_names=False,
+    )
+    assert rollups.countries(2019).index.tolist() == ["Brazil", "Chile", "India"]
+    assert rollups.world(2020)["Records"] == (rows["Year"] == 2020).sum()
+    assert reads == [2019, 2020]
+
+    # Seule l'année dont les données changent est reconstruite.
+    versions[2020] = "b"
+    rollups.countries(2019)
+    rollups.countries(2020)
+    assert reads == [2019, 2020, 2020]
@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import rollups
+import shared_data
+import sketches
+import water_data
+
+CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                   "water_pollution_disease.csv")
+
+
+@pytest.fixture(scope="module")
+def csv():
+    return pd.read_csv(CSV)
+
+
+@pytest.fixture
+def published(csv, tmp_path):
+    generation = shared_data.publish(csv, root=str(tmp_path))
+    return shared_data.attach(str(tmp_path), generation)
+
+
+def memmap_base(values):
+    while values is not None and not isinstance(values, np.memmap):
+        values = values.base
+    return values
+
+
+def as_plain(frame):
+    """Copie en tableaux numpy ordinaires (texte en ``object``) pour comparer au CSV."""
+    return pd.DataFrame({
+        name: np.array(values.astype(object) if values.dtype == "category" else values)
+        for name, values in frame.items()
+    })
+
+
+def test_round_trip_matches_csv(csv, published):
+    expected = csv.sort_values(["Year", "Country"], kind="stable", ignore_index=True)
+    assert expected["Water Treatment Method"].isna().any()
+    pd.testing.assert_frame_equal(as_plain(published.frame), expected, check_dtype=False)
+
+
+def test_columns_and_selections_are_mmap_backed(published):
+    frame = published.frame
+    for name in frame.columns:
+        values = frame[name].array
+        values = values.codes if isinstance(values, pd.Categorical) else values.to_numpy()
+        assert memmap_base(values) is not None, name
+
+    india = published.rows(2019, "India")
+    assert len(india) > 0 and (india["Country"] == "India").all()
+    assert (india["Year"] == 2019).all()
+    assert np.shares_memory(india["pH Level"].to_numpy(), frame["pH Level"].to_numpy())
+    assert published.rows(1800).empty
+
+
+def test_rows_match_a_filter(csv, published):
+    for year, country in [(2019, None), (2005, "Brazil"), (2024, "India")]:
+        expected = csv[csv["Year"] == year].sort_values("Country", kind="stable")
+        if country is not None:
+            expected = expected[expected["Country"] == country]
+        got = as_plain(published.rows(year, country)).reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_cube_gives_groupby_means(csv, published):
+    for year in (2000, 2019):
+        got = rollups.roll_up(*published.cube_aggregates(year))["country"].loc[year]
+        expected = (csv[csv["Year"] == year]
+                    .groupby("Country").mean(numeric_only=True).drop(columns="Year"))
+        pd.testing.assert_frame_equal(got[expected.columns], expected,
+                                      check_dtype=False, check_names=False)
+
+
+def test_shared_sketches_match_a_fresh_build(csv, published):
+    shared = sketches.GroupedSketches.from_arrays(
+        published.sketch_keys, published.sketch_arrays, published.sketch_compression)
+    built = sketches.build_sketches([csv])
+    for key in [(2019, "India"), (2003, "Chile")]:
+        column = "Lead Concentration (µg/L)"
+        np.testing.assert_allclose(shared.sketch(key, column).quantile([0.5, 0.95]),
+                                   built.sketch(key, column).quantile([0.5, 0.95]))
+
+
+def test_new_generation_is_picked_up_and_old_ones_pruned(csv, tmp_path, monkeypatch):
+    root = str(tmp_path)
+    current, attach = shared_data.current_generation, shared_data.attach
+    monkeypatch.setattr(shared_data, "current_generation", lambda root=root: current(root))
+    monkeypatch.setattr(shared_data, "attach",
+                        lambda root=root, generation=None: attach(root, generation))
+    monkeypatch.setattr(water_data, "_state", {"version": None, "shared": None, "frames": {}})
+
+    first = shared_data.publish(csv, root=root)
+    assert water_data.shared_dataset().generation == first
+    before = water_data.selection(2019, "India")
+
+    changed = csv.assign(**{"pH Level": 1.0})
+    second = shared_data.publish(changed, root=root)
+    assert water_data.shared_dataset().generation == second
+    assert (water_data.selection(2019, "India")["pH Level"] == 1.0).all()
+    # Les vues déjà servies restent lisibles après le changement de génération.
+    assert (before["pH Level"] != 1.0).any()
+
+    third = shared_data.publish(csv, root=root, keep=2)
+    generations = sorted(d for d in os.listdir(root) if d.startswith("gen-"))
+    assert generations == sorted([second, third])
+    assert current(root) == third
@@ -0,0 +1,105 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketches import COMPRESSION, GroupedSketches, QuantileSketch
+
+QS = np.array([0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99])
+
+# Erreur de rang tolérée : de l'ordre de 1 / COMPRESSION.
+MAX_RANK_ERROR = 0.01
+
+
+def rank_error(values, estimates, qs=QS):
+    ranks = np.searchsorted(np.sort(values), estimates, side="right") / values.size
+    return np.abs(ranks - qs).max()
+
+
+@pytest.fixture
+def lognormal():
+    return np.random.default_rng(0).lognormal(mean=5, sigma=1.5, size=200_000)
+
+
+def test_rank_error_is_bounded(lognormal):
+    sketch = QuantileSketch().add(lognormal)
+    assert rank_error(lognormal, sketch.quantile(QS)) <= MAX_RANK_ERROR
+    assert sketch.count == lognormal.size
+    assert sketch.quantile(0.0) == lognormal.min()
+    assert sketch.quantile(1.0) == lognormal.max()
+
+
+def test_centroids_stay_bounded(lognormal):
+    sketch = QuantileSketch()
+    for part in np.array_split(lognormal, 20):
+        sketch.add(part)
+    assert sketch.weights.size <= COMPRESSION
+    assert rank_error(lognormal, sketch.quantile(QS)) <= MAX_RANK_ERROR
+
+
+def test_merge_keeps_error_bounded(lognormal):
+    parts = [QuantileSketch().add(part) for part in np.array_split(lognormal, 16)]
+    merged = QuantileSketch.merge(parts)
+    assert merged.count == lognormal.size
+    assert rank_error(lognormal, merged.quantile(QS)) <= MAX_RANK_ERROR
+
+
+def test_empty_sketch_returns_nan():
+    assert np.isnan(QuantileSketch().quantile(0.5))
+    assert np.isnan(QuantileSketch().quantile(QS)).all()
+
+
+def test_grouped_sketches_match_per_group_data():
+    rng = np.random.default_rng(1)
+    n = 60_000
+    df = pd.DataFrame({
+        "Country": rng.choice(["India", "Brazil", "Chile"], n),
+        "Year": rng.choice([2019, 2020], n),
+        "Lead": rng.lognormal(1, 1, n),
+    })
+    df.loc[rng.random(n) < 0.05, "Lead"] = np.nan
+
+    sketches = GroupedSketches()
+    for start in range(0, n, 8_000):
+        sketches.add_chunk(df.iloc[start:start + 8_000])
+
+    for (year, country), group in df.groupby(["Year", "Country"]):
+        values = group["Lead"].dropna().to_numpy()
+        sketch = sketches.sketch((year, country), "Lead")
+        assert sketch.count == values.size
+        assert (sketch.min, sketch.max) == (values.min(), values.max())
+        assert rank_error(values, sketch.quantile(QS)) <= MAX_RANK_ERROR
+
+    assert sketches.sketch((2021, "India"), "Lead").count == 0
+
+
+def test_year_sketches_stream_the_csv(monkeypatch):
+    import sketches
+    import water_data
+
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    monkeypatch.setattr(water_data, "_state", {"version": None, "shared": None, "frames": {}})
+    monkeypatch.setattr(water_data, "_views", OrderedDict())
+    monkeypatch.setattr(water_data, "CHUNK_ROWS", 500)
+    monkeypatch.setattr(sketches, "_cache", {})
+    calls = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, "read_csv",
+                        lambda *args, **kwargs: calls.append(kwargs) or read_csv(*args, **kwargs))
+
+    built = sketches.year_sketches(2015)
+
+    # Lu par blocs, jamais en entier, et seules les lignes de l'année sont gardées.
+    assert calls and all(kwargs.get("chunksize") == 500 for kwargs in calls)
+    assert water_data._state["frames"] == {}
+    csv = read_csv(water_data.CSV_PATH)
+    year = csv[csv["Year"] == 2015]
+    assert {key[0] for key in built.keys} == {2015}
+    column = "Lead Concentration (µg/L)"
+    for country, rows in year.groupby("Country"):
+        sketch = built.sketch((2015, country), column)
+        assert sketch.count == rows[column].notna().sum()
+        assert sketch.quantile(0.0) == rows[column].min()
+        assert sketch.quantile(1.0) == rows[column].max()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+import trends
+from trends import INDICATORS, ROLLING_WINDOW, compute_trends
+
+
+def make_rows(seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for country, years in [("India", range(2000, 2012)), ("Brazil", range(2003, 2010)),
+                           ("Nigeria", range(2000, 2002)), ("Chile", [2005])]:
+        for year in years:
+            for _ in range(3):
+                rows.append({"Country": country, "Year": year,
+                             **{name: rng.normal(50, 10) for name in INDICATORS}})
+    return pd.DataFrame(rows)
+
+
+def reference(df):
+    """Tendances série par série, avec les outils pandas / numpy habituels."""
+    yearly = df.groupby(["Country", "Year"])[list(INDICATORS)].mean()
+    frames = []
+    for country in yearly.index.unique("Country"):
+        series = yearly.loc[country]
+        for indicator in INDICATORS:
+            values = series[indicator]
+            years = values.index.to_numpy(dtype="f8")
+            slope = np.polyfit(years, values, 1)[0] if len(values) > 1 else np.nan
+            std = values.std(ddof=1)
+            frames.append(pd.DataFrame({
+                "Country": country,
+                "Indicator": indicator,
+                "Year": values.index,
+                "Value": values.to_numpy(),
+                "Rolling Mean": values.rolling(ROLLING_WINDOW, min_periods=1).mean().to_numpy(),
+                "YoY Delta": values.diff().to_numpy(),
+                "Slope": slope,
+                "Z-Score": ((values - values.mean()) / std if std > 0 else np.nan * values).to_numpy(),
+            }))
+    return (pd.concat(frames, ignore_index=True)
+            .sort_values(["Country", "Indicator", "Year"], ignore_index=True))
+
+
+def test_compute_trends_matches_per_series_loop():
+    df = make_rows()
+    got = compute_trends(df)
+    expected = reference(df)
+    columns = list(expected.columns)
+    pd.testing.assert_frame_equal(
+        got[columns].reset_index(drop=True), expected, check_dtype=False, rtol=1e-9
+    )
+
+
+def test_alerts_flag_a_spike(monkeypatch):
+    df = make_rows()
+    spike = (df["Country"] == "India") & (df["Year"] == 2011)
+    df.loc[spike, "Lead Concentration (µg/L)"] = 500.0
+    monkeypatch.setattr(trends, "trend_table", lambda: compute_trends(df))
+
+    flagged = trends.alerts(2011, "India")
+    row = flagged[flagged["Indicator"] == "Lead Concentration (µg/L)"].iloc[0]
+    assert row["Alert"] == "anomaly"
+    assert row["Z-Score"] >= trends.Z_THRESHOLD
+    assert trends.alerts(2011, "Brazil").empty
+
+
+def test_trend_table_is_not_cached_under_a_newer_version(monkeypatch):
+    old, new = make_rows(1), make_rows(2)
+    versions = iter(["v1", "v2", "v2", "v2"])
+    monkeypatch.setattr(trends, "_cache", {"version": None, "table": None})
+    monkeypatch.setattr(trends.water_data, "shared_dataset", lambda: None)
+    monkeypatch.setattr(trends.water_data, "dataset_version", lambda: next(versions))
+    # v2 arrive pendant le chargement des données de v1.
+    frames = iter([old, new])
+    monkeypatch.setattr(trends.water_data, "load_dataset", lambda columns: next(frames))
+
+    pd.testing.assert_frame_equal(trends.trend_table(), compute_trends(old))
+    assert trends._cache["version"] is None
+    pd.testing.assert_frame_equal(trends.trend_table(), compute_trends(new))
+    assert trends._cache["version"] == "v2"
@@ -0,0 +1,132 @@
+"""Tendances et anomalies par pays pour les indicateurs de qualité de l'eau.
+
+Toutes les séries Pays × Indicateur (moyennes annuelles) sont traitées en une
+seule passe groupée : moyenne glissante, variation d'une année sur l'autre,
+pente des moindres carrés et z-score de chaque année par rapport à la série.
+Le résultat est mis en cache par version du jeu de données.
+"""
+
+import threading
+
+import water_data
+from startup import lazy_import
+
+np = lazy_import("numpy")
+
+INDICATORS = (
+    "Nitrate Level (mg/L)",
+    "Lead Concentration (µg/L)",
+    "Bacteria Count (CFU/mL)",
+)
+
+ROLLING_WINDOW = 3
+
+# Seuils d'alerte : valeur anormalement haute, ou hausse relative par an.
+Z_THRESHOLD = 2.0
+SLOPE_THRESHOLD = 0.02
+
+TEXTS = {
+    "fr": {
+        "title": "🚨 Alertes qualité de l'eau",
+        "none": "Aucune tendance inquiétante détectée pour cette sélection.",
+    },
+    "en": {
+        "title": "🚨 Water Quality Alerts",
+        "none": "No worrying trend detected for this selection.",
+    },
+}
+
+_lock = threading.Lock()
+_cache = {"version": None, "table": None}
+
+
+def _rolling_mean(values, position, window):
+    # Sommes cumulées sur tout le tableau (trié par série) : la fenêtre de chaque
+    # ligne s'arrête au début de sa série, sans boucle par groupe.
+    valid = values.notna().to_numpy()
+    total = np.concatenate([[0.0], np.cumsum(np.where(valid, values.to_numpy(), 0.0))])
+    count = np.concatenate([[0], np.cumsum(valid)])
+    end = np.arange(1, len(values) + 1)
+    start = end - np.minimum(position.to_numpy() + 1, window)
+    n = count[end] - count[start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, (total[end] - total[start]) / n, np.nan)
+
+
+def compute_trends(df, indicators=INDICATORS, window=ROLLING_WINDOW):
+    """Tableau long (Country, Indicator, Year) des tendances de chaque série."""
+    yearly = df.groupby(["Country", "Year"], observed=True)[list(indicators)].mean()
+    long = (
+        yearly.rename_axis(columns="Indicator")
+        .stack()
+        .rename("Value")
+        .reset_index()
+        .sort_values(["Country", "Indicator", "Year"], ignore_index=True)
+    )
+    long["Country"] = long["Country"].astype(str)
+
+    keys = ["Country", "Indicator"]
+    groups = long.groupby(keys, observed=True, sort=False)
+    long["Rolling Mean"] = _rolling_mean(long["Value"], groups.cumcount(), window)
+    long["YoY Delta"] = groups["Value"].diff()
+
+    # Pente et écart-type à partir de sommes par série, en une seule transformation.
+    x = long["Year"].astype("f8")
+    y = long["Value"]
+    sums = long[keys].assign(n=1.0, x=x, y=y, xy=x * y, xx=x * x, yy=y * y)
+    sums = sums.groupby(keys, observed=True, sort=False).transform("sum")
+    n = sums["n"]
+    mean = sums["y"] / n
+    long["Slope"] = (n * sums["xy"] - sums["x"] * sums["y"]) / (n * sums["xx"] - sums["x"] ** 2)
+    std = ((sums["yy"] - n * mean ** 2) / (n - 1)).clip(lower=0) ** 0.5
+    long["Series Mean"] = mean
+    long["Z-Score"] = (y - mean) / std.where(std > 0)
+    return long
+
+
+def trend_table():
+    """Tendances du jeu de données courant (recalculées à chaque nouvelle version, lues
+    dans la génération publiée en mémoire partagée s'il y en a une)."""
+    shared = water_data.shared_dataset()
+    if shared is not None:
+        return shared.trends
+    version = water_data.dataset_version()
+    with _lock:
+        if _cache["version"] == version:
+            return _cache["table"]
+    table = compute_trends(water_data.load_dataset(["Country", "Year", *INDICATORS]))
+    # Une version arrivée pendant le chargement : ce tableau n'est pas gardé sous son nom.
+    if water_data.dataset_version() == version:
+        with _lock:
+            _cache.update(version=version, table=table)
+    return table
+
+
+def alerts(year, country=None):
+    """Séries anormalement hautes ou en hausse marquée pour ``year`` (et ``country``)."""
+    table = trend_table()
+    rows = table[table["Year"] == year]
+    if country is not None and country not in water_data.ALL_COUNTRIES:
+        rows = rows[rows["Country"] == country]
+
+    anomaly = rows["Z-Score"] >= Z_THRESHOLD
+    rising = rows["Slope"] / rows["Series Mean"].abs() >= SLOPE_THRESHOLD
+    flagged = rows.assign(
+        Alert=anomaly.map({True: "anomaly", False: "rising trend"})
+    )[anomaly | rising]
+    columns = ["Country", "Indicator", "Alert", "Value", "Rolling Mean",
+               "YoY Delta", "Slope", "Z-Score"]
+    return flagged.sort_values("Z-Score", ascending=False)[columns].reset_index(drop=True)
+
+
+def render_alerts(year, country, lang="fr", heading="##"):
+    """Section « alertes » : séries signalées par ``alerts`` pour la sélection."""
+    import streamlit as st
+
+    text = TEXTS[lang]
+    st.markdown(f"{heading} {text['title']}")
+    flagged = alerts(year, country)
+    if flagged.empty:
+        st.success(text["none"])
+    else:
+        st.dataframe(flagged, use_container_width=True)
@@ -0,0 +1,248 @@
+"""Chargement du jeu de données commun à tous les tableaux de bord.
+
+Trois sources, par ordre de priorité :
+
+- un jeu publié en mémoire partagée (``shared_data.py``), auquel chaque
+  processus Streamlit s'attache en lecture seule, sans copie ;
+- un répertoire partitionné par année (``partitions.py``), dont on ne lit que
+  les années et colonnes demandées ;
+- le CSV, lu une fois par processus.
+
+Les sélections (Année, Pays) déjà calculées sont gardées dans un cache LRU
+borné en octets, que ``prefetch.py`` réchauffe en arrière-plan. Avec un jeu en
+mémoire partagée, les sélections sont des tranches sans copie du ``mmap`` et ne
+passent pas par ce cache.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import partitions
+import shared_data
+
+CSV_PATH = "water_pollution_disease.csv"
+DATA_DIR = "data"
+
+# Libellés « tous les pays » utilisés par les filtres des différentes apps.
+ALL_COUNTRIES = ("Tous", "All")
+
+# Colonnes dont les apps ont besoin sur toutes les années (filtres, courbe nitrate).
+OVERVIEW_COLUMNS = ("Country", "Year", "Nitrate Level (mg/L)")
+
+# Lignes par morceau quand une année est parcourue sans être chargée en entier.
+CHUNK_ROWS = 100_000
+
+# Taille maximale du cache des sélections (octets).
+VIEW_CACHE_BYTES = 256 * 1024 * 1024
+
+_lock = threading.RLock()
+_state = {"version": None, "shared": None, "frames": {}}
+_views = OrderedDict()
+
+# hits / misses : requêtes servies ; prefetched : entrées chauffées en tâche de
+# fond ; prefetch_hits : premières requêtes servies par une entrée préchargée.
+CACHE_STATS = {"hits": 0, "misses": 0, "prefetched": 0, "prefetch_hits": 0}
+
+
+def read_csv(path=CSV_PATH):
+    import pandas as pd
+
+    return pd.read_csv(path)
+
+
+def _csv_version(path=CSV_PATH):
+    return f"csv:{os.path.getmtime(path)}"
+
+
+def dataset_version():
+    """Identifiant de la version courante des données (génération, partitions ou CSV)."""
+    generation = shared_data.current_generation()
+    if generation is not None:
+        return generation
+    layout = partitions.layout_version(DATA_DIR)
+    if layout is not None:
+        return f"parts:{layout}"
+    return _csv_version()
+
+
+def year_version(year):
+    """Version des données de ``year`` : seules les années dont les partitions
+    ont changé en changent ; sinon, la version globale."""
+    version = _sync()
+    if _partitioned(version):
+        return f"parts:{year}:{partitions.year_token(DATA_DIR, year)}"
+    return version
+
+
+def _sync():
+    """Suit la version courante ; une nouvelle version vide les caches."""
+    version = dataset_version()
+    with _lock:
+        if version != _state["version"]:
+            shared = None
+            if not version.startswith(("csv:", "parts:")):
+                shared = shared_data.attach(generation=version)
+            _state.update(version=version, shared=shared, frames={})
+            _views.clear()
+    return version
+
+
+def _partitioned(version):
+    return version.startswith("parts:")
+
+
+def load_dataset(columns=None):
+    """Renvoie le DataFrame courant (toutes années), limité à ``columns`` si donné."""
+    version = _sync()
+    key = None if columns is None else tuple(columns)
+    with _lock:
+        if key in _state["frames"]:
+            return _state["frames"][key]
+
+    if _partitioned(version):
+        df = partitions.read(DATA_DIR, columns=columns)
+    else:
+        full = _state["shared"].frame if _state["shared"] is not None else None
+        if full is None:
+            full = _state["frames"].get(None)
+        if full is None:
+            full = read_csv()
+            with _lock:
+                _state["frames"].setdefault(None, full)
+        df = full if columns is None else full[list(columns)]
+
+    with _lock:
+        return _state["frames"].setdefault(key, df)
+
+
+def years():
+    """Années disponibles, sans charger les données quand elles sont partitionnées."""
+    version = _sync()
+    if _partitioned(version):
+        return partitions.partition_years(DATA_DIR)
+    return sorted(int(y) for y in load_dataset(["Year"])["Year"].unique())
+
+
+def year_rows(year, country=None, columns=None):
+    """Lignes de ``year`` (et ``country``), colonnes ``columns``, lues sans passer par le cache."""
+    version = _sync()
+    if country in ALL_COUNTRIES:
+        country = None
+    if _partitioned(version):
+        return partitions.read(
+            DATA_DIR, years=[year], countries=None if country is None else [country],
+            columns=columns,
+        )
+    if _state["shared"] is not None:
+        rows = _state["shared"].rows(year, country)
+        return rows if columns is None else rows[list(columns)]
+    df = load_dataset()
+    rows = df[df["Year"] == year]
+    if country is not None:
+        rows = rows[rows["Country"] == country]
+    return rows if columns is None else rows[list(columns)]
+
+
+def iter_year_chunks(year, chunk_rows=None):
+    """Lignes de ``year`` par morceaux d'au plus ``chunk_rows`` lignes (``CHUNK_ROWS``).
+
+    Réutilise ce qui est déjà en mémoire (jeu partagé, vue de l'année, CSV
+    chargé) ; sinon lit les groupes de lignes des partitions de l'année, ou le
+    CSV par blocs filtrés sur l'année, sans jamais charger tout le fichier.
+    """
+    import pandas as pd
+
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    version = _sync()
+    rows = _state["shared"].rows(year) if _state["shared"] is not None else None
+    if rows is None:
+        rows = _cached_view((year, None), track=False)
+    if rows is None and not _partitioned(version):
+        full = _state["frames"].get(None)
+        rows = None if full is None else full[full["Year"] == year]
+    if rows is not None:
+        for start in range(0, len(rows), chunk_rows):
+            yield rows.iloc[start:start + chunk_rows]
+    elif _partitioned(version):
+        yield from partitions.iter_batches(DATA_DIR, years=[year], batch_rows=chunk_rows)
+    else:
+        for chunk in pd.read_csv(CSV_PATH, chunksize=chunk_rows):
+            chunk = chunk[chunk["Year"] == year]
+            if len(chunk):
+                yield chunk
+
+
+def shared_dataset():
+    """Génération publiée en mémoire partagée à laquelle ce processus est attaché, ou ``None``."""
+    _sync()
+    return _state["shared"]
+
+
+def cached_views():
+    """Clés (année, pays) présentes dans le cache des sélections."""
+    with _lock:
+        return set(_views)
+
+
+def cache_nbytes():
+    with _lock:
+        return sum(nbytes for _, nbytes, _ in _views.values())
+
+
+def _cached_view(key, prefetch=False, track=True):
+    """Vue ``key`` du cache (remise en tête de la LRU), ou ``None`` ; ``track`` compte le hit."""
+    with _lock:
+        if key not in _views:
+            return None
+        view, nbytes, prefetched = _views.pop(key)
+        _views[key] = (view, nbytes, prefetched and (prefetch or not track))
+        if track and not prefetch:
+            CACHE_STATS["hits"] += 1
+            CACHE_STATS["prefetch_hits"] += prefetched
+        return view
+
+
+def _store_view(key, view, prefetch=False, track=True):
+    nbytes = int(view.memory_usage(deep=True).sum())
+    with _lock:
+        _views[key] = (view, nbytes, prefetch and track)
+        if track:
+            CACHE_STATS["prefetched" if prefetch else "misses"] += 1
+        while len(_views) > 1 and cache_nbytes() > VIEW_CACHE_BYTES:
+            _views.popitem(last=False)
+    return view
+
+
+def year_frame(year):
+    """Toutes les lignes de ``year``, lues une fois par version et partagées entre
+    ``selection``, ``rollups`` et ``sketches`` (hors statistiques du cache)."""
+    _sync()
+    if _state["shared"] is not None:
+        return _state["shared"].rows(year)
+    view = _cached_view((year, None), track=False)
+    if view is None:
+        view = _store_view((year, None), year_rows(year), track=False)
+    return view
+
+
+def selection(year, country, prefetch=False):
+    """Lignes de ``year`` pour ``country`` (ou tous les pays), servies depuis le cache.
+
+    La vue d'un pays est filtrée dans les lignes de l'année (``year_frame``) :
+    un clic ne lit qu'une fois la partition de l'année.
+    """
+    _sync()
+    key = (year, None if country in ALL_COUNTRIES else country)
+    if _state["shared"] is not None:
+        return _state["shared"].rows(*key)
+    view = _cached_view(key, prefetch)
+    if view is not None:
+        return view
+
+    if key[1] is None:
+        rows = year_rows(year)
+    else:
+        rows = year_frame(year)
+        rows = rows[rows["Country"] == key[1]]
+    return _store_view(key, rows, prefetch)